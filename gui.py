@@ -10,19 +10,23 @@ from tkinter import font as tkfont
 import subprocess
 import sys
 import os
-import pandas as pd
 from datetime import datetime, timedelta
 import threading
 import time
+import queue
 import json
+import base64
 import sqlite3
 import hashlib
 import shutil
 from collections import Counter
+import itertools
 import csv
 import platform
+import importlib.util
 import webbrowser
 from pathlib import Path
+from contextlib import contextmanager, closing
 
 # Optional imports with fallback
 try:
@@ -37,14 +41,9 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
-try:
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    from matplotlib.figure import Figure
-    import matplotlib.dates as mdates
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+# matplotlib is slow to import, so only check it's installed here;
+# AnalyticsPanel imports it when the chart is first shown
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec("matplotlib") is not None
 
 try:
     import numpy as np
@@ -52,6 +51,18 @@ try:
 except ImportError:
     NUMPY_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ███████╗ CONFIGURATION MANAGER ███████╗
@@ -94,38 +105,84 @@ class ConfigManager:
         "debug_mode": False
     }
     
+    SAVE_DELAY = 0.5  # seconds of quiet before a debounced write
+    
     def __init__(self, config_file="config.json"):
         self.config_file = config_file
         self.config = self.load_config()
+        self._dirty = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
     
     def load_config(self):
         """Load configuration from file or create default"""
+        config = self.DEFAULT_CONFIG.copy()
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r') as f:
-                    loaded = json.load(f)
-                    # Merge with defaults for any missing keys
-                    return {**self.DEFAULT_CONFIG, **loaded}
-            except:
+                # Read raw bytes and let the parser do the UTF-8 decoding
+                with open(self.config_file, 'rb') as f:
+                    data = f.read()
+                if ORJSON_AVAILABLE:
+                    loaded = orjson.loads(data)
+                else:
+                    loaded = json.loads(data)
+                # Valid JSON that isn't an object can't be merged
+                if not isinstance(loaded, dict):
+                    return self.DEFAULT_CONFIG.copy()
+                # Merge with defaults for any missing keys
+                config.update(loaded)
+            except (OSError, ValueError):
                 return self.DEFAULT_CONFIG.copy()
-        return self.DEFAULT_CONFIG.copy()
+        return config
     
     def save_config(self):
         """Save configuration to file"""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
-            return True
-        except Exception as e:
-            print(f"Config save error: {e}")
-            return False
+        with self._save_lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._dirty = False
+            
+            try:
+                if ORJSON_AVAILABLE:
+                    data = orjson.dumps(
+                        self.config,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+                    )
+                else:
+                    # Same bytes as the orjson branch: 2-space indent, raw UTF-8
+                    data = json.dumps(
+                        self.config, indent=2, sort_keys=True, ensure_ascii=False
+                    ).encode("utf-8")
+                
+                # Write to a temp file and swap it in atomically
+                tmp_file = f"{self.config_file}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_file, self.config_file)
+                return True
+            except Exception as e:
+                print(f"Config save error: {e}")
+                return False
+    
+    def flush(self):
+        """Write pending changes immediately"""
+        if self._dirty:
+            self.save_config()
     
     def get(self, key, default=None):
         return self.config.get(key, default)
     
     def set(self, key, value):
         self.config[key] = value
-        self.save_config()
+        
+        # Debounce: one write per quiet period instead of one per key
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self._save_timer.start()
     
     def reset_to_defaults(self):
         self.config = self.DEFAULT_CONFIG.copy()
@@ -136,18 +193,113 @@ class ConfigManager:
 # ███████╗ DATABASE MANAGER ███████╗
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Hot-path statements kept as constants so sqlite3's statement cache hits
+INSERT_ATTENDANCE_SQL = (
+    "INSERT OR IGNORE INTO attendance "
+    "(student_id, name, date, time, status, confidence, late_minutes, session_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+INSERT_LOG_SQL = "INSERT INTO activity_logs (level, message, user) VALUES (?, ?, ?)"
+
+# Keep only the newest N log rows
+TRIM_LOGS_SQL = (
+    "DELETE FROM activity_logs WHERE id IN "
+    "(SELECT id FROM activity_logs ORDER BY id DESC LIMIT -1 OFFSET ?)"
+)
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only SQLite connections on a WAL database"""
+    
+    TIMEOUT = 5  # seconds to wait for a free reader before giving up
+    
+    def __init__(self, db_file, size=4, configure=None):
+        self.db_file = db_file
+        self.size = size
+        self.configure = configure
+        self.pool = queue.Queue(maxsize=size)
+        
+        for _ in range(size):
+            self.pool.put(self._create_connection())
+    
+    def _create_connection(self):
+        """Open a reader connection"""
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if self.configure:
+            self.configure(conn)
+        conn.execute("PRAGMA query_only=TRUE")
+        return conn
+    
+    @contextmanager
+    def read(self):
+        """Borrow a reader connection for the duration of the block"""
+        try:
+            conn = self.pool.get(timeout=self.TIMEOUT)
+        except queue.Empty:
+            # Every reader is still held, e.g. by an unfinished generator
+            raise sqlite3.OperationalError("no database reader connection available") from None
+        try:
+            yield conn
+        finally:
+            self.pool.put(conn)
+    
+    def close(self):
+        """Close all pooled connections"""
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+
+
 class DatabaseManager:
     """SQLite database manager for robust data storage"""
     
-    def __init__(self, db_file="attendance_system.db"):
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA foreign_keys=ON"
+    )
+    
+    LOG_TRIM_INTERVAL = 256  # trim the log table every N inserts
+    
+    ATTENDANCE_COLUMNS = (
+        "id", "student_id", "name", "date", "time", "status",
+        "confidence", "late_minutes", "session_id", "created_at"
+    )
+    
+    def __init__(self, db_file="attendance_system.db", read_pool_size=4, max_log_entries=1000,
+                 shift_start="09:00", late_threshold_minutes=15):
         self.db_file = db_file
         self.conn = None
+        self.lock = threading.Lock()
+        self.max_log_entries = max_log_entries
+        self.late_threshold_minutes = late_threshold_minutes
+        
+        # Parse the shift start once rather than on every attendance record
+        try:
+            self.shift_start = datetime.strptime(shift_start, "%H:%M").time()
+        except (TypeError, ValueError):
+            self.shift_start = datetime.strptime("09:00", "%H:%M").time()
+        self._log_inserts = 0
+        self._stats_cache = None
         self.init_database()
+        self.readers = ConnectionPool(db_file, read_pool_size, self.configure_connection)
+    
+    @classmethod
+    def configure_connection(cls, conn):
+        """Apply WAL journaling and cache tuning to a connection"""
+        for pragma in cls.PRAGMAS:
+            conn.execute(pragma)
     
     def init_database(self):
         """Initialize database with all required tables"""
-        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False, cached_statements=256)
         self.conn.row_factory = sqlite3.Row
+        self.configure_connection(self.conn)
+        self._cursor = self.conn.cursor()
         cursor = self.conn.cursor()
         
         # Students table
@@ -215,27 +367,60 @@ class DatabaseManager:
             )
         ''')
         
+        # Indexes
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_attendance_date_status
+            ON attendance(date, status)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_att_date_time
+            ON attendance(date, time)
+        ''')
+        
+        # UNIQUE(student_id, date) already indexes these columns, so drop
+        # the duplicate index older versions created
+        cursor.execute("DROP INDEX IF EXISTS idx_att_student_date")
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_logs_ts
+            ON activity_logs(timestamp DESC)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_sessions_start
+            ON sessions(start_time DESC)
+        ''')
+        
         self.conn.commit()
     
     def execute(self, query, params=None):
         """Execute a query with optional parameters"""
-        cursor = self.conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        self.conn.commit()
+        with self.lock:
+            cursor = self.conn.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            self.conn.commit()
         return cursor
     
+    def execute_prepared(self, query, params):
+        """Execute a cached statement on the reusable writer cursor"""
+        with self.lock:
+            self._cursor.execute(query, params)
+            self.conn.commit()
+            return self._cursor.rowcount
+    
     def fetch_all(self, query, params=None):
         """Fetch all results from a query"""
-        cursor = self.execute(query, params)
-        return cursor.fetchall()
+        with self.readers.read() as conn:
+            return conn.execute(query, params or ()).fetchall()
     
     def fetch_one(self, query, params=None):
         """Fetch single result from a query"""
-        cursor = self.execute(query, params)
-        return cursor.fetchone()
+        with self.readers.read() as conn:
+            return conn.execute(query, params or ()).fetchone()
     
     # ─── Student Operations ───────────────────────────────────────────────────
     
@@ -255,6 +440,31 @@ class DatabaseManager:
         """Get all active students"""
         return self.fetch_all("SELECT * FROM students WHERE is_active = 1 ORDER BY name")
     
+    def get_student_list_rows(self, student_id=None):
+        """Get display rows for the student list as plain tuples
+        
+        Blank fields become '-' and the registration date is cut to the day
+        in SQL, so rows can go straight into a treeview. Pass student_id to
+        get just that student's row.
+        """
+        query = """
+            SELECT student_id, name,
+                   COALESCE(NULLIF(department, ''), '-'),
+                   COALESCE(NULLIF(batch, ''), '-'),
+                   COALESCE(NULLIF(substr(registered_date, 1, 10), ''), '-')
+            FROM students WHERE is_active = 1
+        """
+        params = ()
+        if student_id is not None:
+            query += " AND student_id = ?"
+            params = (student_id,)
+        query += " ORDER BY name"
+        
+        with self.readers.read() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, params).fetchall()
+    
     def get_student(self, student_id):
         """Get student by ID"""
         return self.fetch_one("SELECT * FROM students WHERE student_id = ?", (student_id,))
@@ -275,58 +485,90 @@ class DatabaseManager:
     
     # ─── Attendance Operations ────────────────────────────────────────────────
     
-    def record_attendance(self, student_id, name, confidence=None, session_id=None):
-        """Record attendance for a student"""
+    def build_attendance_row(self, student_id, name, confidence=None, session_id=None):
+        """Build an attendance row tuple ready for insertion"""
         now = datetime.now()
         date = now.strftime("%Y-%m-%d")
         time_str = now.strftime("%H:%M:%S")
         
-        # Check if already recorded today
-        existing = self.fetch_one(
-            "SELECT * FROM attendance WHERE student_id = ? AND date = ?",
-            (student_id, date)
-        )
-        
-        if existing:
-            return False, "Already marked"
-        
         # Calculate late minutes
-        try:
-            from datetime import datetime as dt
-            check_time = dt.strptime(time_str, "%H:%M:%S").time()
-            start_time = dt.strptime("09:00:00", "%H:%M:%S").time()
-            
-            if check_time > start_time:
-                late_mins = (dt.combine(dt.today(), check_time) - 
-                           dt.combine(dt.today(), start_time)).seconds // 60
-            else:
-                late_mins = 0
-        except:
-            late_mins = 0
+        start_dt = datetime.combine(now.date(), self.shift_start)
+        late_mins = max(0, int((now - start_dt).total_seconds()) // 60)
         
-        status = "Late" if late_mins > 15 else "Present"
+        status = "Late" if late_mins > self.late_threshold_minutes else "Present"
         
-        self.execute('''
-            INSERT INTO attendance (student_id, name, date, time, status, confidence, late_minutes, session_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (student_id, name, date, time_str, status, confidence, late_mins, session_id))
+        return (student_id, name, date, time_str, status, confidence, late_mins, session_id)
+    
+    def record_attendance(self, student_id, name, confidence=None, session_id=None):
+        """Record attendance for a student"""
+        row = self.build_attendance_row(student_id, name, confidence, session_id)
+        
+        # UNIQUE(student_id, date) makes a repeat mark a no-op
+        if self.execute_prepared(INSERT_ATTENDANCE_SQL, row) == 0:
+            return False, "Already marked"
         
-        return True, status
+        return True, row[4]
     
-    def get_attendance_by_date(self, date):
+    def get_attendance_by_date(self, date, limit=None):
         """Get attendance for a specific date"""
-        return self.fetch_all(
-            "SELECT * FROM attendance WHERE date = ? ORDER BY time",
-            (date,)
-        )
+        query = "SELECT * FROM attendance WHERE date = ? ORDER BY time"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return self.fetch_all(query, (date,))
+    
+    def get_attendance_rows_by_date(self, date):
+        """Get the attendance table's display columns for a date as plain tuples"""
+        with self.readers.read() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(
+                """
+                SELECT id, name, student_id, date, time, status, late_minutes
+                FROM attendance WHERE date = ? ORDER BY time
+                """,
+                (date,)
+            ).fetchall()
+    
+    def has_attendance_range(self, start_date, end_date):
+        """Check whether any attendance exists in a date range"""
+        return self.fetch_one(
+            "SELECT 1 FROM attendance WHERE date BETWEEN ? AND ? LIMIT 1",
+            (start_date, end_date)
+        ) is not None
     
     def get_attendance_range(self, start_date, end_date):
-        """Get attendance for date range"""
-        return self.fetch_all('''
-            SELECT * FROM attendance 
-            WHERE date BETWEEN ? AND ?
-            ORDER BY date DESC, time DESC
-        ''', (start_date, end_date))
+        """Stream full attendance rows for a date range as tuples in ATTENDANCE_COLUMNS order"""
+        return self.iter_attendance_range(start_date, end_date, cols=self.ATTENDANCE_COLUMNS)
+    
+    def iter_attendance_range(self, start_date, end_date,
+                              cols=("date", "time", "student_id", "name", "status"),
+                              limit=-1):
+        """Stream attendance rows for a date range, selecting only the given columns
+        
+        The generator holds a pooled reader until it is exhausted or closed;
+        callers that may stop iterating early must call close() on it.
+        """
+        unknown = [c for c in cols if c not in self.ATTENDANCE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown attendance columns: {unknown}")
+        
+        query = (
+            f"SELECT {', '.join(cols)} FROM attendance "
+            "WHERE date BETWEEN ? AND ? "
+            "ORDER BY date DESC, time DESC LIMIT ?"
+        )
+        with self.readers.read() as conn:
+            # Plain tuples; callers know the columns they asked for
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            yield from cursor.execute(query, (start_date, end_date, limit))
+    
+    def count_attendance_range(self, start_date, end_date):
+        """Count attendance records in a date range"""
+        return self.fetch_one(
+            "SELECT COUNT(*) FROM attendance WHERE date BETWEEN ? AND ?",
+            (start_date, end_date)
+        )[0]
     
     def get_student_attendance(self, student_id, limit=None):
         """Get attendance history for a student"""
@@ -336,32 +578,34 @@ class DatabaseManager:
         return self.fetch_all(query, (student_id,))
     
     def get_attendance_stats(self):
-        """Get attendance statistics"""
+        """Get attendance statistics
+        
+        Cached per day and per newest attendance id, so repeat calls are a
+        single index lookup until someone (this process or recognize.py)
+        records attendance.
+        """
         today = datetime.now().strftime("%Y-%m-%d")
+        key = (today, self.fetch_one("SELECT MAX(id) FROM attendance")[0])
+        if self._stats_cache and self._stats_cache[0] == key:
+            return dict(self._stats_cache[1])
+        
         week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
         month_ago = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
         
-        stats = {
-            'today': self.fetch_one(
-                "SELECT COUNT(*) as count FROM attendance WHERE date = ?", (today,)
-            )['count'],
-            'this_week': self.fetch_one(
-                "SELECT COUNT(*) as count FROM attendance WHERE date >= ?", (week_ago,)
-            )['count'],
-            'this_month': self.fetch_one(
-                "SELECT COUNT(*) as count FROM attendance WHERE date >= ?", (month_ago,)
-            )['count'],
-            'total': self.fetch_one(
-                "SELECT COUNT(*) as count FROM attendance"
-            )['count'],
-            'late_today': self.fetch_one(
-                "SELECT COUNT(*) as count FROM attendance WHERE date = ? AND status = 'Late'", (today,)
-            )['count'],
-            'unique_students': self.fetch_one(
-                "SELECT COUNT(DISTINCT student_id) as count FROM attendance"
-            )['count']
-        }
-        return stats
+        row = self.fetch_one('''
+            SELECT
+                COALESCE(SUM(date = ?), 0) AS today,
+                COALESCE(SUM(date >= ?), 0) AS this_week,
+                COALESCE(SUM(date >= ?), 0) AS this_month,
+                COUNT(*) AS total,
+                COALESCE(SUM(date = ? AND status = 'Late'), 0) AS late_today,
+                COUNT(DISTINCT student_id) AS unique_students
+            FROM attendance
+        ''', (today, week_ago, month_ago, today))
+        
+        stats = dict(row)
+        self._stats_cache = (key, stats)
+        return dict(stats)
     
     def get_daily_counts(self, days=30):
         """Get daily attendance counts for chart"""
@@ -404,10 +648,22 @@ class DatabaseManager:
     
     def add_log(self, message, level="INFO", user="system"):
         """Add activity log"""
-        self.execute('''
-            INSERT INTO activity_logs (level, message, user)
-            VALUES (?, ?, ?)
-        ''', (level, message, user))
+        self.execute_prepared(INSERT_LOG_SQL, (level, message, user))
+        
+        self._log_inserts += 1
+        if self._log_inserts % self.LOG_TRIM_INTERVAL == 0:
+            self.trim_logs()
+    
+    def add_logs(self, entries):
+        """Add (level, message, user) log entries in a single transaction"""
+        with self.lock:
+            with self.conn:
+                self.conn.executemany(INSERT_LOG_SQL, entries)
+        
+        before = self._log_inserts
+        self._log_inserts += len(entries)
+        if self._log_inserts // self.LOG_TRIM_INTERVAL != before // self.LOG_TRIM_INTERVAL:
+            self.trim_logs()
     
     def get_logs(self, limit=100, level=None):
         """Get activity logs"""
@@ -424,11 +680,24 @@ class DatabaseManager:
     def clear_old_logs(self, days=30):
         """Clear logs older than specified days"""
         cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        self.execute("DELETE FROM activity_logs WHERE timestamp < ?", (cutoff,))
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM activity_logs WHERE timestamp < ?", (cutoff,))
+                self.conn.execute(TRIM_LOGS_SQL, (self.max_log_entries,))
+    
+    def trim_logs(self):
+        """Cap the log table at max_log_entries rows"""
+        with self.lock:
+            with self.conn:
+                self.conn.execute(TRIM_LOGS_SQL, (self.max_log_entries,))
     
     def close(self):
-        """Close database connection"""
+        """Close database connections"""
+        self.readers.close()
         if self.conn:
+            # Refresh planner statistics for tables that changed this run
+            with self.lock:
+                self.conn.execute("PRAGMA optimize")
             self.conn.close()
 
 
@@ -436,6 +705,22 @@ class DatabaseManager:
 # ███████╗ CUSTOM WIDGETS ███████╗
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def use_flat_button_layout(style, name):
+    """Give a ttk button style clam's border element so its colours apply on any theme"""
+    # Native Windows/macOS button elements ignore background colours;
+    # borrowing clam's element keeps the app on its default theme
+    if "Flat.Button.border" not in style.element_names():
+        style.element_create("Flat.Button.border", "from", "clam")
+    
+    style.layout(name, [
+        ("Flat.Button.border", {"sticky": "nswe", "children": [
+            ("Button.padding", {"sticky": "nswe", "children": [
+                ("Button.label", {"sticky": "nswe"})
+            ]})
+        ]})
+    ])
+
+
 class AnimatedButton(tk.Canvas):
     """Custom animated button with hover effects"""
     
@@ -469,28 +754,42 @@ class AnimatedButton(tk.Canvas):
     
     def draw_button(self, color=None):
         """Draw the button with rounded corners"""
+        if not self.find_withtag("bg"):
+            self._build()
+        self._restyle(color)
+    
+    def _build(self):
+        """Create the button shapes once; later state changes only restyle them"""
         self.delete("all")
         
-        if color is None:
-            color = self.hover_color if self.is_hovered else self.bg_color
-        
-        if not self.enabled:
-            color = "#666666"
-        
         # Draw rounded rectangle
         radius = 8
-        self.create_rounded_rect(2, 2, self.width-2, self.height-2, radius, color)
+        self.create_rounded_rect(2, 2, self.width-2, self.height-2, radius, self.bg_color, tags="bg")
         
         # Draw text
-        display_text = f"{self.icon} {self.text}" if self.icon else self.text
         self.create_text(
             self.width // 2, self.height // 2,
-            text=display_text,
-            fill=self.fg_color if self.enabled else "#999999",
-            font=self.font
+            text=self._display_text(),
+            fill=self.fg_color,
+            font=self.font,
+            tags="label"
         )
     
-    def create_rounded_rect(self, x1, y1, x2, y2, radius, color):
+    def _display_text(self):
+        return f"{self.icon} {self.text}" if self.icon else self.text
+    
+    def _restyle(self, color=None):
+        """Recolor the existing shapes for the current state"""
+        if color is None:
+            color = self.hover_color if self.is_hovered else self.bg_color
+        
+        if not self.enabled:
+            color = "#666666"
+        
+        self.itemconfigure("bg", fill=color)
+        self.itemconfigure("label", fill=self.fg_color if self.enabled else "#999999")
+    
+    def create_rounded_rect(self, x1, y1, x2, y2, radius, color, tags=None):
         """Create a rounded rectangle"""
         points = [
             x1 + radius, y1,
@@ -506,42 +805,43 @@ class AnimatedButton(tk.Canvas):
             x1, y1 + radius,
             x1, y1
         ]
-        self.create_polygon(points, fill=color, smooth=True)
+        self.create_polygon(points, fill=color, smooth=True, tags=tags)
     
     def on_enter(self, event):
         if self.enabled:
             self.is_hovered = True
-            self.draw_button()
+            self._restyle()
     
     def on_leave(self, event):
         self.is_hovered = False
         self.is_pressed = False
-        self.draw_button()
+        self._restyle()
     
     def on_press(self, event):
         if self.enabled:
             self.is_pressed = True
-            self.draw_button(self.hover_color)
+            self._restyle(self.hover_color)
     
     def on_release(self, event):
         if self.enabled and self.is_pressed:
             self.is_pressed = False
-            self.draw_button()
+            self._restyle()
             if self.command:
                 self.command()
     
     def set_enabled(self, enabled):
         self.enabled = enabled
-        self.draw_button()
+        self._restyle()
     
     def configure_button(self, **kwargs):
         if 'text' in kwargs:
             self.text = kwargs['text']
+            self.itemconfigure("label", text=self._display_text())
         if 'bg_color' in kwargs:
             self.bg_color = kwargs['bg_color']
         if 'state' in kwargs:
             self.enabled = kwargs['state'] != 'disabled'
-        self.draw_button()
+        self._restyle()
 
 
 class GradientFrame(tk.Canvas):
@@ -599,46 +899,70 @@ class ToolTip:
         self.text = text
         self.delay = delay
         self.tooltip = None
+        self.label = None
+        self.visible = False
         self.scheduled = None
         
         widget.bind("<Enter>", self.schedule)
         widget.bind("<Leave>", self.hide)
         widget.bind("<Button>", self.hide)
+        widget.bind("<Destroy>", self.destroy, add="+")
     
     def schedule(self, event=None):
         self.scheduled = self.widget.after(self.delay, self.show)
     
     def show(self):
-        if self.tooltip:
+        self.scheduled = None
+        if self.visible:
             return
         
         x = self.widget.winfo_rootx() + 20
         y = self.widget.winfo_rooty() + self.widget.winfo_height() + 5
         
-        self.tooltip = tk.Toplevel(self.widget)
-        self.tooltip.wm_overrideredirect(True)
-        self.tooltip.wm_geometry(f"+{x}+{y}")
+        # Build the window once, then just move and reveal it
+        if self.tooltip is None:
+            self.tooltip = tk.Toplevel(self.widget)
+            self.tooltip.wm_overrideredirect(True)
+            
+            self.label = tk.Label(
+                self.tooltip,
+                text=self.text,
+                background="#ffffe0",
+                foreground="#000000",
+                relief="solid",
+                borderwidth=1,
+                font=("Segoe UI", 9),
+                padx=8,
+                pady=4
+            )
+            self.label.pack()
+        else:
+            self.label.config(text=self.text)
         
-        label = tk.Label(
-            self.tooltip,
-            text=self.text,
-            background="#ffffe0",
-            foreground="#000000",
-            relief="solid",
-            borderwidth=1,
-            font=("Segoe UI", 9),
-            padx=8,
-            pady=4
-        )
-        label.pack()
+        self.tooltip.wm_geometry(f"+{x}+{y}")
+        self.tooltip.deiconify()
+        self.visible = True
     
     def hide(self, event=None):
+        if self.scheduled:
+            self.widget.after_cancel(self.scheduled)
+            self.scheduled = None
+        if self.tooltip and self.visible:
+            self.tooltip.withdraw()
+            self.visible = False
+    
+    def destroy(self, event=None):
+        """Tear down the tooltip window along with its widget"""
+        if event is not None and event.widget is not self.widget:
+            return
         if self.scheduled:
             self.widget.after_cancel(self.scheduled)
             self.scheduled = None
         if self.tooltip:
             self.tooltip.destroy()
             self.tooltip = None
+            self.label = None
+        self.visible = False
 
 
 class CircularProgress(tk.Canvas):
@@ -753,9 +1077,10 @@ class StatCard(tk.Frame):
         ).pack(side=tk.LEFT, padx=10)
         
         # Value
+        self._value = str(value)
         self.value_label = tk.Label(
             self,
-            text=str(value),
+            text=self._value,
             font=("Segoe UI", 28, "bold"),
             bg="#2a2a3e",
             fg="white"
@@ -764,18 +1089,30 @@ class StatCard(tk.Frame):
     
     def update_value(self, value):
         """Update the displayed value"""
-        self.value_label.config(text=str(value))
+        text = str(value)
+        if text == self._value:
+            return
+        self._value = text
+        self.value_label.config(text=text)
 
 
 class SearchableTreeview(tk.Frame):
     """Treeview with search functionality"""
     
+    PAGE_SIZE = 200
+    
     def __init__(self, parent, columns, **kwargs):
         super().__init__(parent, **kwargs)
         
         self.configure(bg="#1e1e2e")
         self.all_items = []
         self.columns = columns
+        self._item_ids = []
+        self._haystacks = []
+        self._filter_job = None
+        self._sort_reverse = {}
+        self._view = []
+        self._shown = 0
         
         # Search frame
         search_frame = tk.Frame(self, bg="#1e1e2e")
@@ -808,7 +1145,7 @@ class SearchableTreeview(tk.Frame):
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
         # Scrollbars
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical")
+        self.vsb = vsb = ttk.Scrollbar(tree_frame, orient="vertical")
         hsb = ttk.Scrollbar(tree_frame, orient="horizontal")
         
         # Configure treeview style
@@ -838,7 +1175,7 @@ class SearchableTreeview(tk.Frame):
             columns=columns,
             show="headings",
             style="Custom.Treeview",
-            yscrollcommand=vsb.set,
+            yscrollcommand=self._on_yscroll,
             xscrollcommand=hsb.set
         )
         
@@ -847,7 +1184,7 @@ class SearchableTreeview(tk.Frame):
         
         # Configure columns
         for col in columns:
-            self.tree.heading(col, text=col, command=lambda c=col: self.sort_column(c, False))
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_column(c))
             self.tree.column(col, width=120, anchor=tk.CENTER)
         
         # Pack
@@ -856,40 +1193,152 @@ class SearchableTreeview(tk.Frame):
         self.tree.pack(fill=tk.BOTH, expand=True)
     
     def insert_items(self, items):
-        """Insert items into treeview"""
-        self.clear()
-        self.all_items = items
-        for item in items:
-            self.tree.insert("", tk.END, values=item)
+        """Insert items into treeview
+        
+        Accepts any iterable (including a DB cursor or generator). Rows are
+        kept as plain tuples and only turned into Tk items a page at a time
+        as the user scrolls, so refresh cost tracks what is visible. Rows
+        already loaded keep their Tk items, so reloading a mostly unchanged
+        list only deletes and inserts the rows that differ.
+        """
+        reusable = {}
+        for item, iid in zip(self.all_items, self._item_ids):
+            if iid is not None:
+                reusable.setdefault(item, []).append(iid)
+        
+        self.all_items = [tuple(item) for item in items]
+        self._item_ids = [
+            reusable[item].pop() if reusable.get(item) else None
+            for item in self.all_items
+        ]
+        
+        stale = [iid for iids in reusable.values() for iid in iids]
+        if stale:
+            self.tree.delete(*stale)
+        
+        # Lowercased search text per row, built once rather than per keystroke
+        self._haystacks = ["\0".join(map(str, item)).lower() for item in self.all_items]
+        self._apply_filter()
+    
+    def _show_more(self):
+        """Attach the next page of matching rows, creating Tk items on first use"""
+        end = min(self._shown + self.PAGE_SIZE, len(self._view))
+        if end == self._shown:
+            return
+        
+        # Hide the columns while attaching so Tk doesn't lay out each row
+        display_columns = self.tree.cget("displaycolumns")
+        self.tree.configure(displaycolumns=())
+        
+        try:
+            for i in self._view[self._shown:end]:
+                iid = self._item_ids[i]
+                if iid is None:
+                    self._item_ids[i] = self.tree.insert("", tk.END, values=self.all_items[i])
+                else:
+                    self.tree.move(iid, "", tk.END)
+        finally:
+            self.tree.configure(displaycolumns=display_columns)
+        self._shown = end
+    
+    def _on_yscroll(self, first, last):
+        """Update the scrollbar and load more rows near the bottom"""
+        self.vsb.set(first, last)
+        if float(last) >= 0.9 and self._shown < len(self._view):
+            self.after_idle(self._show_more)
     
     def clear(self):
         """Clear all items"""
         self.all_items = []
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self._haystacks = []
+        # Detached (filtered out) rows aren't children, so delete by id
+        created = [iid for iid in self._item_ids if iid is not None]
+        if created:
+            self.tree.delete(*created)
+        self._item_ids = []
+        self._view = []
+        self._shown = 0
+    
+    def add_item(self, item):
+        """Append a single row without reloading the list"""
+        item = tuple(item)
+        haystack = "\0".join(map(str, item)).lower()
+        
+        self.all_items.append(item)
+        self._item_ids.append(None)
+        self._haystacks.append(haystack)
+        
+        if self.search_var.get().lower() in haystack:
+            all_shown = self._shown == len(self._view)
+            self._view.append(len(self.all_items) - 1)
+            if all_shown:
+                self._show_more()
+    
+    def remove_selected(self):
+        """Remove the selected row without reloading the list"""
+        selection = self.tree.selection()
+        if not selection:
+            return
+        
+        i = self._item_ids.index(selection[0])
+        self.tree.delete(selection[0])
+        del self.all_items[i]
+        del self._item_ids[i]
+        del self._haystacks[i]
+        
+        if i in self._view:
+            if self._view.index(i) < self._shown:
+                self._shown -= 1
+            self._view.remove(i)
+        self._view = [j - 1 if j > i else j for j in self._view]
     
     def filter_items(self, *args):
         """Filter items based on search"""
+        if self._filter_job:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(80, self._apply_filter)
+    
+    def _apply_filter(self):
+        """Show only the rows matching the search text"""
+        self._filter_job = None
         search = self.search_var.get().lower()
         
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        created = [iid for iid in self._item_ids if iid is not None]
+        if created:
+            self.tree.detach(*created)
         
-        # Insert matching items
-        for item in self.all_items:
-            if any(search in str(val).lower() for val in item):
-                self.tree.insert("", tk.END, values=item)
+        self._view = [i for i, haystack in enumerate(self._haystacks) if search in haystack]
+        self._shown = 0
+        self._show_more()
+    
+    @staticmethod
+    def _sort_key(value):
+        """Numeric-aware sort key: numbers by value first, then text"""
+        try:
+            return (float(value), str(value))
+        except (TypeError, ValueError):
+            return (float("inf"), str(value))
     
-    def sort_column(self, col, reverse):
+    def sort_column(self, col, reverse=None):
         """Sort treeview by column"""
-        items = [(self.tree.set(child, col), child) for child in self.tree.get_children('')]
-        items.sort(reverse=reverse)
+        if reverse is None:
+            reverse = self._sort_reverse.get(col, False)
+        
+        col_idx = self.columns.index(col)
+        order = sorted(
+            range(len(self.all_items)),
+            key=lambda i: self._sort_key(self.all_items[i][col_idx]),
+            reverse=reverse
+        )
+        
+        self.all_items = [self.all_items[i] for i in order]
+        self._item_ids = [self._item_ids[i] for i in order]
+        self._haystacks = [self._haystacks[i] for i in order]
         
-        for index, (val, child) in enumerate(items):
-            self.tree.move(child, '', index)
+        # Re-lay out rows in the new order, keeping the current search filter
+        self._apply_filter()
         
-        self.tree.heading(col, command=lambda: self.sort_column(col, not reverse))
+        self._sort_reverse[col] = not reverse
     
     def get_selected(self):
         """Get selected item"""
@@ -906,6 +1355,8 @@ class SearchableTreeview(tk.Frame):
 class CameraPreviewPanel(tk.Frame):
     """Real-time camera preview panel"""
     
+    TARGET_FPS = 30
+    
     def __init__(self, parent, width=640, height=480, **kwargs):
         super().__init__(parent, **kwargs)
         
@@ -914,6 +1365,23 @@ class CameraPreviewPanel(tk.Frame):
         self.cap = None
         self.is_running = False
         self.preview_thread = None
+        self._photo = None
+        self._image_id = None
+        self._pil = None
+        self._ppm = None
+        self._frame_shown = threading.Event()
+        self._visible = threading.Event()
+        
+        # Frame buffers reused every frame so the preview loop doesn't allocate
+        if NUMPY_AVAILABLE:
+            self._resized_buf = np.empty((height, width, 3), dtype=np.uint8)
+            if PIL_AVAILABLE:
+                # RGBA matches Pillow's internal pixel layout, so wrapping it needs no unpacking
+                self._rgba_buf = np.empty((height, width, 4), dtype=np.uint8)
+            else:
+                # Without Pillow, frames go to Tk as binary PPM
+                self._rgb_buf = np.empty((height, width, 3), dtype=np.uint8)
+                self._ppm_header = f"P6\n{width} {height}\n255\n".encode()
         
         self.configure(bg="#1a1a2e")
         
@@ -975,6 +1443,7 @@ class CameraPreviewPanel(tk.Frame):
     def show_placeholder(self):
         """Show placeholder image"""
         self.canvas.delete("all")
+        self._image_id = None
         self.canvas.create_text(
             self.width // 2,
             self.height // 2,
@@ -990,21 +1459,34 @@ class CameraPreviewPanel(tk.Frame):
             messagebox.showerror("Error", "OpenCV not installed!")
             return
         
-        if not PIL_AVAILABLE:
-            messagebox.showerror("Error", "Pillow not installed!")
-            return
-        
         try:
             self.cap = cv2.VideoCapture(0)
             if not self.cap.isOpened():
                 messagebox.showerror("Error", "Cannot open camera!")
                 return
             
+            # Keep the driver queue short so grabbed frames are fresh
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
+            # Ask the camera for the preview size so frames arrive pre-scaled
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            
+            # One PhotoImage for the whole session; frames are pasted into it
+            self.canvas.delete("all")
+            if PIL_AVAILABLE:
+                self._photo = ImageTk.PhotoImage("RGBA", (self.width, self.height))
+            else:
+                self._photo = tk.PhotoImage(width=self.width, height=self.height)
+            self._image_id = self.canvas.create_image(0, 0, anchor=tk.NW, image=self._photo)
+            
             self.is_running = True
             self.start_btn.config(state=tk.DISABLED)
             self.stop_btn.config(state=tk.NORMAL)
             self.status_label.config(text="Camera active", fg="#4CAF50")
             
+            self._check_visible()
             self.preview_thread = threading.Thread(target=self.update_preview, daemon=True)
             self.preview_thread.start()
             
@@ -1013,23 +1495,70 @@ class CameraPreviewPanel(tk.Frame):
     
     def update_preview(self):
         """Update camera preview"""
+        # Pace to the camera's own frame rate; some drivers report 0
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or self.TARGET_FPS
+        period = 1.0 / fps
+        deadline = time.monotonic()
+        self._frame_shown.set()
+        
         while self.is_running and self.cap and self.cap.isOpened():
-            ret, frame = self.cap.read()
+            cap = self.cap
+            
+            # Grab without decoding until the next display slot so only the
+            # newest frame is ever retrieved and converted
+            grabbed = cap.grab()
+            while grabbed and time.monotonic() < deadline:
+                grabbed = cap.grab()
+            deadline = time.monotonic() + period
+            
+            if not grabbed:
+                time.sleep(period)
+                continue
+            
+            # The UI hasn't shown the previous frame yet, or the preview is on a
+            # hidden tab, so don't decode this one
+            if not self._frame_shown.is_set() or not self._visible.is_set():
+                continue
+            
+            ret, frame = cap.retrieve()
             if ret:
-                # Convert frame to RGB
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame = cv2.resize(frame, (self.width, self.height))
-                
-                # Convert to PhotoImage
-                image = Image.fromarray(frame)
-                photo = ImageTk.PhotoImage(image)
+                # Resize only if the camera didn't honour the requested size
+                if frame.shape[:2] != (self.height, self.width):
+                    frame = cv2.resize(frame, (self.width, self.height), dst=self._resized_buf)
                 
-                # Update canvas
-                self.canvas.delete("all")
-                self.canvas.create_image(0, 0, anchor=tk.NW, image=photo)
-                self.canvas.image = photo
-            
-            time.sleep(0.03)  # ~30 FPS
+                if PIL_AVAILABLE:
+                    # Convert to RGBA into the preallocated buffer
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self._rgba_buf)
+                    
+                    # Wrap the frame without copying; the Tk thread pastes it
+                    self._pil = Image.frombuffer(
+                        "RGBA", (self.width, self.height), self._rgba_buf, "raw", "RGBA", 0, 1
+                    )
+                else:
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+                    self._ppm = base64.b64encode(self._ppm_header + self._rgb_buf.tobytes())
+                self._frame_shown.clear()
+                self.after_idle(self._blit)
+    
+    def _blit(self):
+        """Paste the latest frame into the canvas image (runs on the Tk thread)"""
+        if self.is_running and self._photo is not None:
+            if self._pil is not None:
+                self._photo.paste(self._pil)
+            elif self._ppm is not None:
+                self._photo.configure(data=self._ppm)
+            self._check_visible()
+        self._frame_shown.set()
+    
+    def _check_visible(self):
+        """Track whether the preview is on screen (runs on the Tk thread)"""
+        if self.winfo_viewable():
+            self._visible.set()
+        else:
+            self._visible.clear()
+            # Nothing is drawn while hidden, so poll to resume
+            if self.is_running:
+                self.after(250, self._check_visible)
     
     def stop_preview(self):
         """Stop camera preview"""
@@ -1054,6 +1583,17 @@ class CameraPreviewPanel(tk.Frame):
 # ███████╗ ANALYTICS PANEL ███████╗
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Stat cards: (stats key, title, icon, colour)
+ANALYTICS_CARDS = (
+    ("today", "Today", "📅", "#4CAF50"),
+    ("this_week", "This Week", "📆", "#2196F3"),
+    ("this_month", "This Month", "🗓️", "#ff9800"),
+    ("total", "Total Records", "📊", "#9c27b0"),
+    ("late_today", "Late Today", "⏰", "#f44336"),
+    ("unique_students", "Unique Students", "👥", "#00bcd4")
+)
+
+
 class AnalyticsPanel(tk.Frame):
     """Analytics and visualization panel"""
     
@@ -1088,21 +1628,12 @@ class AnalyticsPanel(tk.Frame):
         
         stats = self.db.get_attendance_stats()
         
-        # Create stat cards
-        cards_data = [
-            ("Today", stats['today'], "📅", "#4CAF50"),
-            ("This Week", stats['this_week'], "📆", "#2196F3"),
-            ("This Month", stats['this_month'], "🗓️", "#ff9800"),
-            ("Total Records", stats['total'], "📊", "#9c27b0"),
-            ("Late Today", stats['late_today'], "⏰", "#f44336"),
-            ("Unique Students", stats['unique_students'], "👥", "#00bcd4")
-        ]
-        
-        self.stat_cards = []
-        for i, (title, value, icon, color) in enumerate(cards_data):
-            card = StatCard(stats_frame, title, value, icon, color)
+        # Create stat cards, keyed by their stats field
+        self.stat_cards = {}
+        for i, (key, title, icon, color) in enumerate(ANALYTICS_CARDS):
+            card = StatCard(stats_frame, title, stats[key], icon, color)
             card.grid(row=i//3, column=i%3, padx=10, pady=10, sticky="nsew")
-            self.stat_cards.append((title, card))
+            self.stat_cards[key] = card
         
         # Configure grid weights
         for i in range(3):
@@ -1120,104 +1651,129 @@ class AnalyticsPanel(tk.Frame):
             ).pack(pady=20)
             return
         
-        charts_frame = tk.Frame(self, bg="#1e1e2e")
-        charts_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        self.charts_frame = tk.Frame(self, bg="#1e1e2e")
+        self.charts_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+        self.fig = None
+        
+        # Refresh button
+        refresh_btn = tk.Button(
+            self.charts_frame,
+            text="🔄 Refresh Data",
+            command=self.refresh_data,
+            bg="#4CAF50",
+            fg="white",
+            font=("Segoe UI", 10),
+            relief="flat",
+            padx=20,
+            pady=8
+        )
+        refresh_btn.pack(side=tk.BOTTOM, pady=10)
         
-        # Create matplotlib figure
-        self.fig = Figure(figsize=(10, 4), facecolor="#1e1e2e")
-        self.fig.subplots_adjust(bottom=0.2)
+        # Lightweight placeholder until the tab is first shown
+        self.chart_placeholder = tk.Label(
+            self.charts_frame,
+            text="📈 Loading chart...",
+            font=("Segoe UI", 12),
+            bg="#1e1e2e",
+            fg="#b4b4c8"
+        )
+        self.chart_placeholder.pack(fill=tk.BOTH, expand=True)
+        
+        self.bind("<Map>", self.on_map)
+    
+    def on_map(self, event):
+        """Build the chart the first time the panel becomes visible"""
+        if event.widget is self:
+            self.ensure_chart()
+    
+    def ensure_chart(self):
+        """Create the matplotlib figure and canvas on first use"""
+        if self.fig is not None:
+            return
+        
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        self.chart_placeholder.destroy()
+        
+        # Create matplotlib figure; constrained layout keeps the rotated
+        # labels in view without a tight_layout pass on every refresh
+        self.fig = Figure(figsize=(10, 4), facecolor="#1e1e2e", constrained_layout=True)
         
         # Daily attendance chart
         self.ax = self.fig.add_subplot(111)
+        self._bars = None
         self.ax.set_facecolor("#2a2a3e")
         
-        # Style the chart
+        # Style the chart once; refreshes only touch the data
         self.ax.tick_params(colors='white')
         self.ax.spines['bottom'].set_color('white')
         self.ax.spines['top'].set_color('#2a2a3e')
         self.ax.spines['left'].set_color('white')
         self.ax.spines['right'].set_color('#2a2a3e')
+        self.ax.set_xlabel("Date", color='white', fontsize=10)
+        self.ax.set_ylabel("Attendance Count", color='white', fontsize=10)
+        self.ax.set_title("Daily Attendance (Last 30 Days)", color='white', fontsize=12, fontweight='bold')
+        
+        self._empty_text = self.ax.text(
+            0.5, 0.5,
+            "No data available",
+            ha='center', va='center',
+            color='white', fontsize=14,
+            transform=self.ax.transAxes,
+            visible=False
+        )
         
         # Get data and plot
         self.update_chart()
         
         # Add canvas
-        self.canvas = FigureCanvasTkAgg(self.fig, charts_frame)
+        self.canvas = FigureCanvasTkAgg(self.fig, self.charts_frame)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        
-        # Refresh button
-        refresh_btn = tk.Button(
-            charts_frame,
-            text="🔄 Refresh Data",
-            command=self.refresh_data,
-            bg="#4CAF50",
-            fg="white",
-            font=("Segoe UI", 10),
-            relief="flat",
-            padx=20,
-            pady=8
-        )
-        refresh_btn.pack(pady=10)
     
     def update_chart(self):
         """Update the attendance chart"""
-        self.ax.clear()
-        
         # Get daily counts
         data = self.db.get_daily_counts(30)
+        dates = [row['date'] for row in data]
+        counts = [row['count'] for row in data]
         
-        if data:
-            dates = [row['date'] for row in data]
-            counts = [row['count'] for row in data]
-            
-            # Create bar chart
-            bars = self.ax.bar(dates, counts, color="#4CAF50", alpha=0.8)
-            
-            # Customize
-            self.ax.set_xlabel("Date", color='white', fontsize=10)
-            self.ax.set_ylabel("Attendance Count", color='white', fontsize=10)
-            self.ax.set_title("Daily Attendance (Last 30 Days)", color='white', fontsize=12, fontweight='bold')
-            
-            # Rotate x-axis labels
-            plt.setp(self.ax.get_xticklabels(), rotation=45, ha='right')
-            
-            # Set colors
-            self.ax.tick_params(colors='white')
-            self.ax.set_facecolor("#2a2a3e")
+        if self._bars is not None and len(self._bars) == len(counts):
+            # Same number of days as last time: move the existing bars
+            for rect, count in zip(self._bars, counts):
+                rect.set_height(count)
         else:
-            self.ax.text(
-                0.5, 0.5,
-                "No data available",
-                ha='center', va='center',
-                color='white', fontsize=14,
-                transform=self.ax.transAxes
-            )
+            if self._bars is not None:
+                self._bars.remove()
+                self._bars = None
+            if data:
+                self._bars = self.ax.bar(range(len(dates)), counts, color="#4CAF50", alpha=0.8)
+        
+        self._empty_text.set_visible(not data)
         
-        self.fig.tight_layout()
+        # Date labels, rotated
+        self.ax.set_xticks(range(len(dates)), labels=dates, rotation=45, ha='right')
+        self.ax.relim()
+        self.ax.autoscale_view()
     
     def refresh_data(self):
         """Refresh all data"""
         # Update stats
         stats = self.db.get_attendance_stats()
         
-        stats_map = {
-            "Today": stats['today'],
-            "This Week": stats['this_week'],
-            "This Month": stats['this_month'],
-            "Total Records": stats['total'],
-            "Late Today": stats['late_today'],
-            "Unique Students": stats['unique_students']
-        }
-        
-        for title, card in self.stat_cards:
-            if title in stats_map:
-                card.update_value(stats_map[title])
+        for key, card in self.stat_cards.items():
+            card.update_value(stats[key])
+        # One layout pass for all cards
+        self.update_idletasks()
         
         # Update chart
         if MATPLOTLIB_AVAILABLE:
-            self.update_chart()
-            self.canvas.draw()
+            if self.fig is None:
+                self.ensure_chart()
+            else:
+                self.update_chart()
+                self.canvas.draw_idle()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1444,7 +2000,8 @@ class StudentManagementPanel(tk.Frame):
         if success:
             messagebox.showinfo("Success", f"Student '{name}' added successfully!")
             self.clear_form()
-            self.refresh_student_list()
+            for row in self.db.get_student_list_rows(student_id):
+                self.student_tree.add_item(row)
         else:
             messagebox.showerror("Error", "Student ID already exists!")
     
@@ -1455,18 +2012,7 @@ class StudentManagementPanel(tk.Frame):
     
     def refresh_student_list(self):
         """Refresh the student list"""
-        students = self.db.get_all_students()
-        items = [
-            (
-                s['student_id'],
-                s['name'],
-                s['department'] or '-',
-                s['batch'] or '-',
-                s['registered_date'][:10] if s['registered_date'] else '-'
-            )
-            for s in students
-        ]
-        self.student_tree.insert_items(items)
+        self.student_tree.insert_items(self.db.get_student_list_rows())
     
     def edit_student(self):
         """Edit selected student"""
@@ -1494,7 +2040,7 @@ class StudentManagementPanel(tk.Frame):
         
         if messagebox.askyesno("Confirm Delete", f"Delete student '{selected[1]}'?"):
             self.db.delete_student(selected[0])
-            self.refresh_student_list()
+            self.student_tree.remove_selected()
             messagebox.showinfo("Success", "Student deleted successfully!")
     
     def capture_face(self):
@@ -1544,20 +2090,18 @@ class SettingsPanel(tk.Frame):
         self.notebook = ModernNotebook(self)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
-        # General settings
-        self.create_general_settings()
-        
-        # Recognition settings
-        self.create_recognition_settings()
+        self.setting_widgets = {}
         
-        # Notification settings
-        self.create_notification_settings()
+        # Tabs are built the first time they are shown
+        self._tab_builders = {}
+        self.add_lazy_tab("🏠 General", self.create_general_settings)
+        self.add_lazy_tab("🎯 Recognition", self.create_recognition_settings)
+        self.add_lazy_tab("🔔 Notifications", self.create_notification_settings)
+        self.add_lazy_tab("💾 Backup", self.create_backup_settings)
+        self.add_lazy_tab("ℹ️ About", self.create_about_section)
         
-        # Backup settings
-        self.create_backup_settings()
-        
-        # About section
-        self.create_about_section()
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.on_tab_changed()
         
         # Save button
         tk.Button(
@@ -1572,10 +2116,21 @@ class SettingsPanel(tk.Frame):
             pady=10
         ).pack(pady=20)
     
-    def create_general_settings(self):
-        """Create general settings tab"""
+    def add_lazy_tab(self, text, builder):
+        """Add an empty tab whose contents are built on first show"""
         frame = tk.Frame(self.notebook, bg="#1e1e2e")
-        self.notebook.add(frame, text="🏠 General")
+        self.notebook.add(frame, text=text)
+        self._tab_builders[str(frame)] = builder
+    
+    def on_tab_changed(self, event=None):
+        """Build the selected tab if it hasn't been built yet"""
+        selected = self.notebook.select()
+        builder = self._tab_builders.pop(selected, None)
+        if builder:
+            builder(self.nametowidget(selected))
+    
+    def create_general_settings(self, frame):
+        """Create general settings tab"""
         
         # Theme selection
         self.create_setting_row(
@@ -1635,10 +2190,8 @@ class SettingsPanel(tk.Frame):
             tooltip="Show helpful tooltips on hover"
         )
     
-    def create_recognition_settings(self):
+    def create_recognition_settings(self, frame):
         """Create recognition settings tab"""
-        frame = tk.Frame(self.notebook, bg="#1e1e2e")
-        self.notebook.add(frame, text="🎯 Recognition")
         
         # Camera index
         self.create_setting_row(
@@ -1687,10 +2240,8 @@ class SettingsPanel(tk.Frame):
             "Minutes after which marked as late"
         )
     
-    def create_notification_settings(self):
+    def create_notification_settings(self, frame):
         """Create notification settings tab"""
-        frame = tk.Frame(self.notebook, bg="#1e1e2e")
-        self.notebook.add(frame, text="🔔 Notifications")
         
         # Sound
         self.create_setting_row(
@@ -1710,10 +2261,8 @@ class SettingsPanel(tk.Frame):
             tooltip="Show desktop notifications"
         )
     
-    def create_backup_settings(self):
+    def create_backup_settings(self, frame):
         """Create backup settings tab"""
-        frame = tk.Frame(self.notebook, bg="#1e1e2e")
-        self.notebook.add(frame, text="💾 Backup")
         
         # Auto backup
         self.create_setting_row(
@@ -1766,10 +2315,8 @@ class SettingsPanel(tk.Frame):
             pady=8
         ).pack(pady=20)
     
-    def create_about_section(self):
+    def create_about_section(self, frame):
         """Create about tab"""
-        frame = tk.Frame(self.notebook, bg="#1e1e2e")
-        self.notebook.add(frame, text="ℹ️ About")
         
         # App info
         info_frame = tk.Frame(frame, bg="#2a2a3e")
@@ -1876,55 +2423,53 @@ Powered by Machine Learning
                 selectcolor="#2a2a3e",
                 activebackground="#1e1e2e"
             )
-            widget.var = var
+            widget.value = var.get
             
+        # The other widgets hold their own value and are read at save time,
+        # so they don't need a Tcl variable
         elif widget_type == "combobox":
-            var = tk.StringVar(value=current_value)
             widget = ttk.Combobox(
                 row,
-                textvariable=var,
                 values=options,
                 state="readonly",
                 width=20
             )
-            widget.var = var
+            widget.set(current_value)
+            widget.value = widget.get
             
         elif widget_type == "spinbox":
-            var = tk.IntVar(value=current_value)
             widget = tk.Spinbox(
                 row,
                 from_=options[0],
                 to=options[1],
-                textvariable=var,
                 width=10,
                 bg="#2a2a3e",
                 fg="white",
                 buttonbackground="#363650"
             )
-            widget.var = var
+            widget.delete(0, tk.END)
+            widget.insert(0, current_value)
+            widget.value = lambda: int(widget.get())
             
         elif widget_type == "scale":
-            var = tk.DoubleVar(value=current_value)
             widget = tk.Scale(
                 row,
                 from_=options[0],
                 to=options[1],
                 resolution=0.05,
                 orient=tk.HORIZONTAL,
-                variable=var,
                 bg="#1e1e2e",
                 fg="white",
                 troughcolor="#2a2a3e",
                 highlightthickness=0,
                 length=200
             )
-            widget.var = var
+            widget.set(current_value)
+            widget.value = widget.get
             
         else:  # entry
-            var = tk.StringVar(value=current_value)
             widget = tk.Entry(
                 row,
-                textvariable=var,
                 font=("Segoe UI", 10),
                 bg="#2a2a3e",
                 fg="white",
@@ -1932,13 +2477,12 @@ Powered by Machine Learning
                 relief="flat",
                 width=20
             )
-            widget.var = var
+            widget.insert(0, "" if current_value is None else current_value)
+            widget.value = widget.get
         
         widget.pack(side=tk.LEFT, padx=10)
         
         # Store reference
-        if not hasattr(self, 'setting_widgets'):
-            self.setting_widgets = {}
         self.setting_widgets[key] = widget
         
         # Tooltip
@@ -1948,48 +2492,88 @@ Powered by Machine Learning
     def save_settings(self):
         """Save all settings"""
         for key, widget in self.setting_widgets.items():
-            self.config.set(key, widget.var.get())
+            self.config.set(key, widget.value())
         
         messagebox.showinfo("Settings Saved", "All settings have been saved successfully!")
     
     def create_backup(self):
         """Create manual backup"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_dir = f"backups/backup_{timestamp}"
+        threading.Thread(target=self._run_backup, args=(backup_dir,), daemon=True).start()
+    
+    def _run_backup(self, backup_dir):
+        """Copy data files and pack them into one archive (runs on a worker thread)"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_dir = f"backups/backup_{timestamp}"
             os.makedirs(backup_dir, exist_ok=True)
             
-            # Copy database
-            if os.path.exists("attendance_system.db"):
-                shutil.copy("attendance_system.db", f"{backup_dir}/attendance_system.db")
+            # The online backup API gives a consistent snapshot that includes
+            # rows still in the WAL file, even while recognition is writing
+            db_file = "attendance_system.db"
+            if os.path.exists(db_file):
+                src = sqlite3.connect(db_file)
+                dst = sqlite3.connect(os.path.join(backup_dir, db_file))
+                try:
+                    src.backup(dst)
+                finally:
+                    dst.close()
+                    src.close()
             
-            # Copy config
-            if os.path.exists("config.json"):
-                shutil.copy("config.json", f"{backup_dir}/config.json")
+            # copyfile skips the metadata copy and uses the OS fast-copy path
+            for name in ("config.json", "model.pkl", "encodings.npy", "names.json"):
+                if os.path.exists(name):
+                    shutil.copyfile(name, os.path.join(backup_dir, name))
             
-            # Copy model
-            if os.path.exists("model.pkl"):
-                shutil.copy("model.pkl", f"{backup_dir}/model.pkl")
+            # One compressed artifact per backup
+            archive = shutil.make_archive(backup_dir, "gztar", root_dir=backup_dir)
+            shutil.rmtree(backup_dir)
             
-            messagebox.showinfo("Backup Complete", f"Backup created at:\n{backup_dir}")
+            self.after(0, lambda: messagebox.showinfo("Backup Complete", f"Backup created at:\n{archive}"))
             
         except Exception as e:
-            messagebox.showerror("Backup Failed", f"Error creating backup:\n{str(e)}")
+            error = str(e)
+            self.after(0, lambda: messagebox.showerror("Backup Failed", f"Error creating backup:\n{error}"))
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ███████╗ REPORTS PANEL ███████╗
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Quick date range buttons: (label, days back; 0 = today, -1 = all time)
+QUICK_DATE_RANGES = (
+    ("Today", 0),
+    ("This Week", 7),
+    ("This Month", 30),
+    ("All Time", -1)
+)
+
+# Export buttons: (label, ReportsPanel method, colour)
+EXPORT_OPTIONS = (
+    ("📄 Export CSV", "export_csv", "#4CAF50"),
+    ("📊 Export Excel", "export_excel", "#217346"),
+    ("📋 Export JSON", "export_json", "#f39c12"),
+    ("📑 Generate PDF Report", "generate_pdf", "#e74c3c"),
+    ("🖨️ Print Report", "print_report", "#9b59b6")
+)
+
+
 class ReportsPanel(tk.Frame):
     """Reports generation panel"""
     
+    PREVIEW_LIMIT = 500
+    
     def __init__(self, parent, db_manager, **kwargs):
         super().__init__(parent, **kwargs)
         
         self.db = db_manager
         self.configure(bg="#1e1e2e")
         
+        self._reload_job = None
+        
+        # Exports run on a worker thread and report back through this queue
+        self._export_thread = None
+        self._export_queue = queue.Queue()
+        
         # Header
         header = tk.Frame(self, bg="#2a2a3e")
         header.pack(fill=tk.X)
@@ -2032,18 +2616,29 @@ class ReportsPanel(tk.Frame):
         quick_frame = tk.Frame(frame, bg="#2a2a3e")
         quick_frame.pack(fill=tk.X, pady=(0, 10))
         
-        for text, days in [("Today", 0), ("This Week", 7), 
-                          ("This Month", 30), ("All Time", -1)]:
-            tk.Button(
+        style = ttk.Style()
+        use_flat_button_layout(style, "Range.TButton")
+        style.configure(
+            "Range.TButton",
+            background="#363650",
+            foreground="white",
+            font=("Segoe UI", 9),
+            relief="flat",
+            borderwidth=0,
+            padding=(15, 5)
+        )
+        style.map(
+            "Range.TButton",
+            background=[("pressed", "#1e1e2e"), ("active", "#2a2a3e")],
+            foreground=[("active", "white")]
+        )
+        
+        for text, days in QUICK_DATE_RANGES:
+            ttk.Button(
                 quick_frame,
                 text=text,
                 command=lambda d=days: self.set_date_range(d),
-                bg="#363650",
-                fg="white",
-                font=("Segoe UI", 9),
-                relief="flat",
-                padx=15,
-                pady=5
+                style="Range.TButton"
             ).pack(side=tk.LEFT, padx=5)
         
         # Custom date range
@@ -2058,7 +2653,8 @@ class ReportsPanel(tk.Frame):
             font=("Segoe UI", 10)
         ).pack(side=tk.LEFT, padx=5)
         
-        self.start_date_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.start_date_var = tk.StringVar(value=today)
         tk.Entry(
             custom_frame,
             textvariable=self.start_date_var,
@@ -2077,7 +2673,7 @@ class ReportsPanel(tk.Frame):
             font=("Segoe UI", 10)
         ).pack(side=tk.LEFT, padx=5)
         
-        self.end_date_var = tk.StringVar(value=datetime.now().strftime("%Y-%m-%d"))
+        self.end_date_var = tk.StringVar(value=today)
         tk.Entry(
             custom_frame,
             textvariable=self.end_date_var,
@@ -2113,29 +2709,30 @@ class ReportsPanel(tk.Frame):
         )
         frame.pack(fill=tk.X, pady=(0, 15))
         
-        btn_frame = tk.Frame(frame, bg="#2a2a3e")
-        btn_frame.pack(fill=tk.X)
-        
-        export_options = [
-            ("📄 Export CSV", self.export_csv, "#4CAF50"),
-            ("📊 Export Excel", self.export_excel, "#217346"),
-            ("📋 Export JSON", self.export_json, "#f39c12"),
-            ("📑 Generate PDF Report", self.generate_pdf, "#e74c3c"),
-            ("🖨️ Print Report", self.print_report, "#9b59b6")
-        ]
+        # All export buttons are drawn on one canvas rather than being
+        # separate widgets; clicks are dispatched by item tag
+        toolbar = tk.Canvas(frame, height=46, bg="#2a2a3e", highlightthickness=0)
+        toolbar.pack(fill=tk.X)
         
-        for text, command, color in export_options:
-            tk.Button(
-                btn_frame,
+        x = 5
+        for text, method, color in EXPORT_OPTIONS:
+            tag = f"export_{method}"
+            label = toolbar.create_text(
+                x + 15, 23,
                 text=text,
-                command=command,
-                bg=color,
-                fg="white",
+                anchor=tk.W,
+                fill="white",
                 font=("Segoe UI", 10),
-                relief="flat",
-                padx=15,
-                pady=8
-            ).pack(side=tk.LEFT, padx=5, pady=5)
+                tags=(tag,)
+            )
+            right = toolbar.bbox(label)[2] + 15
+            rect = toolbar.create_rectangle(x, 5, right, 41, fill=color, outline="", tags=(tag,))
+            toolbar.tag_lower(rect, label)
+            
+            toolbar.tag_bind(tag, "<Button-1>", lambda e, m=method: getattr(self, m)())
+            toolbar.tag_bind(tag, "<Enter>", lambda e: toolbar.config(cursor="hand2"))
+            toolbar.tag_bind(tag, "<Leave>", lambda e: toolbar.config(cursor=""))
+            x = right + 10
     
     def create_preview_area(self, parent):
         """Create report preview area"""
@@ -2150,6 +2747,29 @@ class ReportsPanel(tk.Frame):
         )
         frame.pack(fill=tk.BOTH, expand=True)
         
+        # Export progress, shown only while an export runs
+        self.export_status = tk.Frame(frame, bg="#2a2a3e")
+        self.export_bar = ttk.Progressbar(self.export_status, mode="indeterminate", length=200)
+        self.export_bar.pack(side=tk.LEFT, padx=(0, 10))
+        self.export_label = tk.Label(
+            self.export_status,
+            text="",
+            font=("Segoe UI", 9),
+            bg="#2a2a3e",
+            fg="#b4b4c8"
+        )
+        self.export_label.pack(side=tk.LEFT)
+        
+        # Shown when the preview is capped
+        self.preview_note = tk.Label(
+            frame,
+            text="",
+            font=("Segoe UI", 9),
+            bg="#2a2a3e",
+            fg="#b4b4c8"
+        )
+        self.preview_note.pack(side=tk.BOTTOM, fill=tk.X, pady=(5, 0))
+        
         columns = ("Name", "Student ID", "Date", "Time", "Status")
         self.report_tree = SearchableTreeview(frame, columns)
         self.report_tree.pack(fill=tk.BOTH, expand=True)
@@ -2174,18 +2794,32 @@ class ReportsPanel(tk.Frame):
         self.load_report_data()
     
     def load_report_data(self):
-        """Load report data for preview"""
+        """Load report data for preview, coalescing rapid repeat requests"""
+        if self._reload_job:
+            self.after_cancel(self._reload_job)
+        self._reload_job = self.after(200, self._load_report_data_now)
+    
+    def _load_report_data_now(self):
+        """Query and show the preview for the current date range"""
+        self._reload_job = None
         start = self.start_date_var.get()
         end = self.end_date_var.get()
         
-        records = self.db.get_attendance_range(start, end)
+        # Preview only the newest rows; exports still cover the whole range
+        records = self.db.iter_attendance_range(
+            start, end, cols=("name", "student_id", "date", "time", "status"),
+            limit=self.PREVIEW_LIMIT
+        )
         
-        items = [
-            (r['name'], r['student_id'], r['date'], r['time'], r['status'])
-            for r in records
-        ]
+        # Close even if the load is interrupted, so the reader goes back to the pool
+        with closing(records):
+            self.report_tree.insert_items(records)
         
-        self.report_tree.insert_items(items)
+        hidden = self.db.count_attendance_range(start, end) - self.PREVIEW_LIMIT
+        if hidden > 0:
+            self.preview_note.config(text=f"({hidden:,} more rows — use Export to see all)")
+        else:
+            self.preview_note.config(text="")
     
     def get_report_data(self):
         """Get data for export"""
@@ -2193,74 +2827,137 @@ class ReportsPanel(tk.Frame):
         end = self.end_date_var.get()
         return self.db.get_attendance_range(start, end)
     
-    def export_csv(self):
-        """Export to CSV"""
+    def ask_export_filename(self, extension, file_type):
+        """Ask where to save an export, or return None if there's nothing to export"""
+        if not self.db.has_attendance_range(self.start_date_var.get(), self.end_date_var.get()):
+            messagebox.showinfo("No Data", "No records to export!")
+            return None
+        
+        return filedialog.asksaveasfilename(
+            defaultextension=extension,
+            filetypes=[(file_type, f"*{extension}")],
+            initialfile=f"attendance_report_{datetime.now().strftime('%Y%m%d')}{extension}"
+        )
+    
+    def start_export(self, writer, filename):
+        """Run an export writer on a worker thread"""
+        if self._export_thread and self._export_thread.is_alive():
+            messagebox.showwarning("Export Running", "Please wait for the current export to finish.")
+            return
+        
+        self.export_label.config(text="Exporting...")
+        self.export_status.pack(fill=tk.X, pady=(0, 10), before=self.report_tree)
+        self.export_bar.start(10)
+        
+        self._export_thread = threading.Thread(
+            target=self._run_export,
+            args=(writer, filename, self.get_report_data()),
+            daemon=True
+        )
+        self._export_thread.start()
+        self.after(100, self._drain_export_queue)
+    
+    def _run_export(self, writer, filename, data):
+        """Worker thread body: write the file and post the outcome"""
         try:
-            data = self.get_report_data()
-            if not data:
-                messagebox.showinfo("No Data", "No records to export!")
-                return
-            
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv")],
-                initialfile=f"attendance_report_{datetime.now().strftime('%Y%m%d')}.csv"
-            )
-            
-            if filename:
-                df = pd.DataFrame([dict(row) for row in data])
-                df.to_csv(filename, index=False)
-                messagebox.showinfo("Export Complete", f"Exported to:\n{filename}")
-                
+            writer(filename, data)
+            self._export_queue.put(("done", filename))
+        except ImportError as e:
+            self._export_queue.put(("error", f"Install {e.name}: pip install {e.name}"))
         except Exception as e:
-            messagebox.showerror("Export Error", str(e))
+            self._export_queue.put(("error", str(e)))
+        finally:
+            data.close()
+    
+    def _drain_export_queue(self):
+        """Apply export progress on the Tk thread until the export finishes"""
+        try:
+            while True:
+                kind, value = self._export_queue.get_nowait()
+                if kind == "progress":
+                    self.export_label.config(text=f"Exported {value:,} rows...")
+                    continue
+                
+                self.export_bar.stop()
+                self.export_status.pack_forget()
+                if kind == "done":
+                    messagebox.showinfo("Export Complete", f"Exported to:\n{value}")
+                else:
+                    messagebox.showerror("Export Error", value)
+                return
+        except queue.Empty:
+            pass
+        
+        self.after(100, self._drain_export_queue)
+    
+    def export_csv(self):
+        """Export to CSV"""
+        filename = self.ask_export_filename(".csv", "CSV files")
+        if filename:
+            self.start_export(self._write_csv, filename)
+    
+    def _write_csv(self, filename, data):
+        """Write rows to CSV as they come off the cursor"""
+        with open(filename, 'w', newline='', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(self.db.ATTENDANCE_COLUMNS)
+            count = 0
+            while True:
+                chunk = list(itertools.islice(data, 1000))
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                count += len(chunk)
+                self._export_queue.put(("progress", count))
     
     def export_excel(self):
         """Export to Excel"""
+        filename = self.ask_export_filename(".xlsx", "Excel files")
+        if filename:
+            self.start_export(self._write_excel, filename)
+    
+    def _write_excel(self, filename, data):
+        """Write rows to an Excel workbook"""
+        if not XLSXWRITER_AVAILABLE:
+            # pandas is slow to import and only needed for this fallback
+            import pandas as pd
+            df = pd.DataFrame(list(data), columns=self.db.ATTENDANCE_COLUMNS)
+            df.to_excel(filename, index=False, engine='openpyxl')
+            return
+        
+        # constant_memory flushes each row to disk once written
+        workbook = xlsxwriter.Workbook(filename, {'constant_memory': True, 'use_zip64': True})
         try:
-            data = self.get_report_data()
-            if not data:
-                messagebox.showinfo("No Data", "No records to export!")
-                return
-            
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx")],
-                initialfile=f"attendance_report_{datetime.now().strftime('%Y%m%d')}.xlsx"
-            )
-            
-            if filename:
-                df = pd.DataFrame([dict(row) for row in data])
-                df.to_excel(filename, index=False, engine='openpyxl')
-                messagebox.showinfo("Export Complete", f"Exported to:\n{filename}")
-                
-        except ImportError:
-            messagebox.showerror("Error", "Install openpyxl: pip install openpyxl")
-        except Exception as e:
-            messagebox.showerror("Export Error", str(e))
+            sheet = workbook.add_worksheet()
+            sheet.write_row(0, 0, self.db.ATTENDANCE_COLUMNS)
+            for r, row in enumerate(data, 1):
+                sheet.write_row(r, 0, row)
+                if r % 1000 == 0:
+                    self._export_queue.put(("progress", r))
+        finally:
+            workbook.close()
     
     def export_json(self):
         """Export to JSON"""
-        try:
-            data = self.get_report_data()
-            if not data:
-                messagebox.showinfo("No Data", "No records to export!")
-                return
-            
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".json",
-                filetypes=[("JSON files", "*.json")],
-                initialfile=f"attendance_report_{datetime.now().strftime('%Y%m%d')}.json"
-            )
-            
-            if filename:
-                records = [dict(row) for row in data]
-                with open(filename, 'w') as f:
-                    json.dump(records, f, indent=2, default=str)
-                messagebox.showinfo("Export Complete", f"Exported to:\n{filename}")
-                
-        except Exception as e:
-            messagebox.showerror("Export Error", str(e))
+        filename = self.ask_export_filename(".json", "JSON files")
+        if filename:
+            self.start_export(self._write_json, filename)
+    
+    def _write_json(self, filename, data):
+        """Write rows to JSON one record at a time"""
+        # Frame the array by hand; the output matches json.dump(..., indent=2)
+        columns = self.db.ATTENDANCE_COLUMNS
+        with open(filename, 'w') as f:
+            f.write("[")
+            count = 0
+            for count, row in enumerate(data, 1):
+                if count > 1:
+                    f.write(",")
+                if count % 1000 == 0:
+                    self._export_queue.put(("progress", count))
+                record = json.dumps(dict(zip(columns, row)), indent=2, default=str)
+                f.write("\n  " + record.replace("\n", "\n  "))
+            f.write("\n]" if count else "]")
     
     def generate_pdf(self):
         """Generate PDF report"""
@@ -2285,6 +2982,25 @@ class ReportsPanel(tk.Frame):
 # ███████╗ MAIN APPLICATION ███████╗
 # ═══════════════════════════════════════════════════════════════════════════════
 
+# Sidebar navigation: (label, notebook tab index)
+NAV_ITEMS = (
+    ("🏠 Dashboard", 0),
+    ("📋 Attendance", 1),
+    ("👥 Students", 2),
+    ("📈 Analytics", 3),
+    ("📑 Reports", 4),
+    ("⚙️ Settings", 5)
+)
+
+# Dashboard stat cards: (stats key, title, icon, colour)
+DASHBOARD_CARDS = (
+    ("today", "Today's Attendance", "👥", "#4CAF50"),
+    ("this_week", "Weekly Total", "📅", "#2196F3"),
+    ("this_month", "Monthly Total", "🗓️", "#ff9800"),
+    ("total", "All Time", "📊", "#9c27b0")
+)
+
+
 class AttendanceSystemGUI:
     """Main GUI class for Face Recognition Attendance System - ENHANCED"""
     
@@ -2293,7 +3009,11 @@ class AttendanceSystemGUI:
         
         # Initialize managers
         self.config = ConfigManager()
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(
+            max_log_entries=self.config.get('max_log_entries', 1000),
+            shift_start=self.config.get('working_hours_start', "09:00"),
+            late_threshold_minutes=self.config.get('late_threshold_minutes', 15)
+        )
         
         # Window setup
         self.setup_window()
@@ -2311,6 +3031,16 @@ class AttendanceSystemGUI:
         self.model_file = "model.pkl"
         self.recognize_script = "recognize.py"
         
+        # Daily log file, kept open and flushed on a timer
+        self._log_file = None
+        self._log_day = None
+        self._log_flush_job = None
+        
+        # Activity log rows are written off the UI thread in batches
+        self._log_queue = queue.Queue()
+        self._log_thread = threading.Thread(target=self._drain_log_queue, daemon=True)
+        self._log_thread.start()
+        
         # Initialize UI
         self.create_main_interface()
         self.check_dependencies()
@@ -2363,10 +3093,34 @@ class AttendanceSystemGUI:
         self.accent_orange = "#ff9800"
         
         self.root.configure(bg=self.bg_primary)
+        
+        # Shared button styles, configured once instead of per widget
+        style = ttk.Style()
+        use_flat_button_layout(style, "Nav.TButton")
+        style.configure(
+            "Nav.TButton",
+            background=self.bg_tertiary,
+            foreground=self.fg_primary,
+            font=("Segoe UI", 10),
+            relief="flat",
+            borderwidth=0,
+            padding=(15, 8),
+            anchor=tk.W
+        )
+        style.map(
+            "Nav.TButton",
+            background=[("active", self.accent_blue)],
+            foreground=[("active", "white")]
+        )
     
     def create_main_interface(self):
         """Create the main application interface"""
         
+        # Date strings shared by the header, dashboard and footer
+        now = datetime.now()
+        self.today_long = now.strftime('%A, %B %d, %Y')
+        self.today_iso = now.strftime("%Y-%m-%d")
+        
         # ═══════════════════════════════════════════════════════════════════════
         # HEADER
         # ═══════════════════════════════════════════════════════════════════════
@@ -2454,13 +3208,17 @@ class AttendanceSystemGUI:
         self.notebook = ModernNotebook(content_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Create tabs
-        self.create_dashboard_tab()
-        self.create_attendance_tab()
-        self.create_students_tab()
-        self.create_analytics_tab()
-        self.create_reports_tab()
-        self.create_settings_tab()
+        # Create tabs; each is built the first time it is shown
+        self._tab_builders = {}
+        self.add_lazy_tab("🏠 Dashboard", self.create_dashboard_tab)
+        self.add_lazy_tab("📋 Attendance", self.create_attendance_tab)
+        self.add_lazy_tab("👥 Students", self.create_students_tab)
+        self.add_lazy_tab("📈 Analytics", self.create_analytics_tab)
+        self.add_lazy_tab("📑 Reports", self.create_reports_tab)
+        self.add_lazy_tab("⚙️ Settings", self.create_settings_tab)
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.on_tab_changed()
         
         # ═══════════════════════════════════════════════════════════════════════
         # FOOTER / STATUS BAR
@@ -2473,7 +3231,7 @@ class AttendanceSystemGUI:
         # Left info
         tk.Label(
             footer,
-            text=f"📅 {datetime.now().strftime('%A, %B %d, %Y')}",
+            text=f"📅 {self.today_long}",
             font=("Segoe UI", 9),
             bg=self.bg_tertiary,
             fg=self.fg_secondary
@@ -2542,29 +3300,12 @@ class AttendanceSystemGUI:
             fg=self.fg_primary
         ).pack(anchor=tk.W, padx=15, pady=(0, 10))
         
-        nav_items = [
-            ("🏠 Dashboard", 0),
-            ("📋 Attendance", 1),
-            ("👥 Students", 2),
-            ("📈 Analytics", 3),
-            ("📑 Reports", 4),
-            ("⚙️ Settings", 5)
-        ]
-        
-        for text, tab_index in nav_items:
-            btn = tk.Button(
+        for text, tab_index in NAV_ITEMS:
+            btn = ttk.Button(
                 sidebar,
                 text=text,
                 command=lambda idx=tab_index: self.notebook.select(idx),
-                font=("Segoe UI", 10),
-                bg=self.bg_tertiary,
-                fg=self.fg_primary,
-                activebackground=self.accent_blue,
-                activeforeground="white",
-                relief="flat",
-                anchor=tk.W,
-                padx=15,
-                pady=8,
+                style="Nav.TButton",
                 cursor="hand2"
             )
             btn.pack(fill=tk.X, padx=15, pady=2)
@@ -2616,10 +3357,21 @@ class AttendanceSystemGUI:
         )
         exit_btn.pack(side=tk.BOTTOM, fill=tk.X, padx=15, pady=15)
     
-    def create_dashboard_tab(self):
+    def add_lazy_tab(self, text, builder):
+        """Add an empty tab whose contents are built on first show"""
+        frame = tk.Frame(self.notebook, bg=self.bg_primary)
+        self.notebook.add(frame, text=text)
+        self._tab_builders[str(frame)] = builder
+    
+    def on_tab_changed(self, event=None):
+        """Build the selected tab if it hasn't been built yet"""
+        selected = self.notebook.select()
+        builder = self._tab_builders.pop(selected, None)
+        if builder:
+            builder(self.root.nametowidget(selected))
+    
+    def create_dashboard_tab(self, dashboard):
         """Create dashboard tab"""
-        dashboard = tk.Frame(self.notebook, bg=self.bg_primary)
-        self.notebook.add(dashboard, text="🏠 Dashboard")
         
         # Welcome section
         welcome_frame = tk.Frame(dashboard, bg=self.bg_secondary)
@@ -2635,7 +3387,7 @@ class AttendanceSystemGUI:
         
         tk.Label(
             welcome_frame,
-            text=f"Today is {datetime.now().strftime('%A, %B %d, %Y')}",
+            text=f"Today is {self.today_long}",
             font=("Segoe UI", 12),
             bg=self.bg_secondary,
             fg=self.fg_secondary
@@ -2647,15 +3399,8 @@ class AttendanceSystemGUI:
         
         stats = self.db.get_attendance_stats()
         
-        cards_data = [
-            ("Today's Attendance", stats['today'], "👥", self.accent_green),
-            ("Weekly Total", stats['this_week'], "📅", self.accent_blue),
-            ("Monthly Total", stats['this_month'], "🗓️", self.accent_orange),
-            ("All Time", stats['total'], "📊", "#9c27b0")
-        ]
-        
-        for i, (title, value, icon, color) in enumerate(cards_data):
-            card = StatCard(stats_frame, title, value, icon, color)
+        for key, title, icon, color in DASHBOARD_CARDS:
+            card = StatCard(stats_frame, title, stats[key], icon, color)
             card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
         
         # Two column layout
@@ -2702,30 +3447,33 @@ class AttendanceSystemGUI:
         recent_list = tk.Frame(recent_frame, bg=self.bg_secondary)
         recent_list.pack(fill=tk.BOTH, expand=True)
         
-        today = datetime.now().strftime("%Y-%m-%d")
-        recent_records = self.db.get_attendance_by_date(today)[:10]
+        recent_records = self.db.get_attendance_by_date(self.today_iso, limit=10)
         
         if recent_records:
+            # One widget for the whole list rather than a frame and two labels per row
+            style = ttk.Style()
+            style.configure(
+                "Recent.Treeview",
+                background=self.bg_tertiary,
+                foreground=self.fg_primary,
+                fieldbackground=self.bg_secondary,
+                font=("Segoe UI", 10),
+                rowheight=30
+            )
+            
+            recent_tree = ttk.Treeview(
+                recent_list,
+                columns=("name", "time"),
+                show="",
+                height=10,
+                style="Recent.Treeview"
+            )
+            recent_tree.column("name", anchor=tk.W)
+            recent_tree.column("time", anchor=tk.E, width=90, stretch=False)
+            recent_tree.pack(fill=tk.BOTH, expand=True)
+            
             for record in recent_records:
-                item_frame = tk.Frame(recent_list, bg=self.bg_tertiary)
-                item_frame.pack(fill=tk.X, pady=2)
-                
-                tk.Label(
-                    item_frame,
-                    text=f"✓ {record['name']}",
-                    font=("Segoe UI", 10),
-                    bg=self.bg_tertiary,
-                    fg=self.fg_primary,
-                    anchor=tk.W
-                ).pack(side=tk.LEFT, padx=10, pady=5)
-                
-                tk.Label(
-                    item_frame,
-                    text=record['time'],
-                    font=("Segoe UI", 9),
-                    bg=self.bg_tertiary,
-                    fg=self.fg_secondary
-                ).pack(side=tk.RIGHT, padx=10, pady=5)
+                recent_tree.insert("", tk.END, values=(f"✓ {record['name']}", record['time']))
         else:
             tk.Label(
                 recent_list,
@@ -2735,10 +3483,9 @@ class AttendanceSystemGUI:
                 fg=self.fg_secondary
             ).pack(pady=20)
     
-    def create_attendance_tab(self):
+    def create_attendance_tab(self, attendance_frame):
         """Create attendance viewing tab"""
-        attendance_frame = tk.Frame(self.notebook, bg=self.bg_primary)
-        self.notebook.add(attendance_frame, text="📋 Attendance")
+        self._filter_job = None
         
         # Header with filters
         filter_frame = tk.Frame(attendance_frame, bg=self.bg_secondary)
@@ -2810,45 +3557,39 @@ class AttendanceSystemGUI:
         # Load initial data
         self.filter_attendance()
     
-    def create_students_tab(self):
+    def create_students_tab(self, parent):
         """Create students management tab"""
-        students_panel = StudentManagementPanel(self.notebook, self.db)
-        self.notebook.add(students_panel, text="👥 Students")
+        students_panel = StudentManagementPanel(parent, self.db)
+        students_panel.pack(fill=tk.BOTH, expand=True)
     
-    def create_analytics_tab(self):
+    def create_analytics_tab(self, parent):
         """Create analytics tab"""
-        analytics_panel = AnalyticsPanel(self.notebook, self.db)
-        self.notebook.add(analytics_panel, text="📈 Analytics")
+        analytics_panel = AnalyticsPanel(parent, self.db)
+        analytics_panel.pack(fill=tk.BOTH, expand=True)
     
-    def create_reports_tab(self):
+    def create_reports_tab(self, parent):
         """Create reports tab"""
-        reports_panel = ReportsPanel(self.notebook, self.db)
-        self.notebook.add(reports_panel, text="📑 Reports")
+        reports_panel = ReportsPanel(parent, self.db)
+        reports_panel.pack(fill=tk.BOTH, expand=True)
     
-    def create_settings_tab(self):
+    def create_settings_tab(self, parent):
         """Create settings tab"""
-        settings_panel = SettingsPanel(self.notebook, self.config)
-        self.notebook.add(settings_panel, text="⚙️ Settings")
+        settings_panel = SettingsPanel(parent, self.config)
+        settings_panel.pack(fill=tk.BOTH, expand=True)
     
     def filter_attendance(self):
-        """Filter attendance by date"""
+        """Filter attendance by date, coalescing rapid repeat requests"""
+        if self._filter_job:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(200, self._filter_attendance_now)
+    
+    def _filter_attendance_now(self):
+        """Query and show attendance for the filter date"""
+        self._filter_job = None
         date = self.filter_date.get()
-        records = self.db.get_attendance_by_date(date)
-        
-        items = [
-            (
-                r['id'],
-                r['name'],
-                r['student_id'],
-                r['date'],
-                r['time'],
-                r['status'],
-                r['late_minutes']
-            )
-            for r in records
-        ]
         
-        self.attendance_tree.insert_items(items)
+        # Unchanged rows keep their tree items; only the differences are redrawn
+        self.attendance_tree.insert_items(self.db.get_attendance_rows_by_date(date))
     
     def quick_filter(self, period):
         """Quick filter by period"""
@@ -2879,17 +3620,69 @@ class AttendanceSystemGUI:
         self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
         
-        # Save to database
-        self.db.add_log(message, level)
+        # Save to database from the log writer thread
+        self._log_queue.put((level, message, "system"))
         
         # Log to file if enabled
         if self.config.get('log_to_file'):
-            log_dir = "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
+            now = datetime.now()
+            day = now.strftime('%Y%m%d')
+            
+            # Reopen only when the day rolls over
+            if day != self._log_day:
+                self.close_log_file()
+                log_dir = "logs"
+                os.makedirs(log_dir, exist_ok=True)
+                self._log_file = open(os.path.join(log_dir, f"app_{day}.log"), 'a')
+                self._log_day = day
+            
+            self._log_file.write(f"[{now.isoformat()}] [{level}] {message}\n")
+            if not self._log_flush_job:
+                self._log_flush_job = self.root.after(500, self.flush_log_file)
+    
+    def flush_log_file(self):
+        """Write buffered log lines to disk"""
+        self._log_flush_job = None
+        if self._log_file:
+            self._log_file.flush()
+    
+    def _drain_log_queue(self):
+        """Write queued activity log entries to the database in batches"""
+        while True:
+            batch = [self._log_queue.get()]
+            
+            # Let a burst of messages coalesce into one commit
+            time.sleep(0.05)
+            while True:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
             
-            with open(log_file, 'a') as f:
-                f.write(f"[{datetime.now().isoformat()}] [{level}] {message}\n")
+            stop = None in batch
+            entries = [entry for entry in batch if entry is not None]
+            if entries:
+                try:
+                    self.db.add_logs(entries)
+                except sqlite3.Error as e:
+                    print(f"Activity log write error: {e}")
+            if stop:
+                return
+    
+    def stop_log_writer(self):
+        """Flush queued activity log entries and stop the writer thread"""
+        self._log_queue.put(None)
+        self._log_thread.join(timeout=2)
+    
+    def close_log_file(self):
+        """Flush and close the daily log file"""
+        if self._log_flush_job:
+            self.root.after_cancel(self._log_flush_job)
+            self._log_flush_job = None
+        if self._log_file:
+            self._log_file.close()
+            self._log_file = None
+            self._log_day = None
     
     def update_status(self, status, color):
         """Update status indicators"""
@@ -2939,12 +3732,14 @@ class AttendanceSystemGUI:
             try:
                 self.log_message("Starting face recognition...", "INFO")
                 
+                # Output is read as bytes, so pin the child's stdout to UTF-8
+                # rather than the console code page
                 self.recognition_process = subprocess.Popen(
                     [sys.executable, self.recognize_script],
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
+                    bufsize=65536,
+                    env={**os.environ, "PYTHONIOENCODING": "utf-8"}
                 )
                 
                 self.is_running = True
@@ -2960,11 +3755,17 @@ class AttendanceSystemGUI:
                 self.timer_running = True
                 self.root.after(0, self.update_timer)
                 
-                # Monitor output
-                for line in self.recognition_process.stdout:
-                    line = line.strip()
-                    if line:
-                        self.root.after(0, lambda l=line: self.process_recognition_output(l))
+                # Monitor output: take whatever is in the pipe in one read and
+                # hand all complete lines to the UI in one callback
+                stdout = self.recognition_process.stdout
+                pending = b""
+                while True:
+                    chunk = stdout.read1(65536)
+                    if not chunk:
+                        break
+                    *lines, pending = (pending + chunk).split(b"\n")
+                    self.post_recognition_lines(lines)
+                self.post_recognition_lines([pending])
                 
                 self.recognition_process.wait()
                 self.cleanup_after_stop()
@@ -2976,6 +3777,13 @@ class AttendanceSystemGUI:
         thread = threading.Thread(target=run_recognition, daemon=True)
         thread.start()
     
+    def post_recognition_lines(self, raw_lines):
+        """Decode raw output lines and queue them for the Tk thread"""
+        lines = [l.decode("utf-8", errors="replace").strip() for l in raw_lines]
+        lines = [l for l in lines if l]
+        if lines:
+            self.root.after(0, lambda: [self.process_recognition_output(l) for l in lines])
+    
     def process_recognition_output(self, line):
         """Process output from recognition script"""
         self.log_message(line, "INFO")
@@ -3123,8 +3931,11 @@ class AttendanceSystemGUI:
             self.config.set('last_window_x', self.root.winfo_x())
             self.config.set('last_window_y', self.root.winfo_y())
         
-        self.db.close()
         self.log_message("Application closed", "INFO")
+        self.close_log_file()
+        self.stop_log_writer()
+        self.config.flush()
+        self.db.close()
         self.root.destroy()
 
 
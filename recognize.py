@@ -1,48 +1,102 @@
+import os
+
+# Keep dlib's OpenMP pool (and OpenCV's, below) small so they don't
+# fight each other and the GUI for cores
+os.environ.setdefault("OMP_NUM_THREADS", "2")
+
 import cv2
+import dlib
 import face_recognition
+import numpy as np
 import pickle
-import os
+import json
 import sqlite3
 from datetime import datetime
 import time
 import sys
+import threading
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+cv2.setNumThreads(2)
 
 
 # ================= CONFIG =================
 
 MODEL_FILE = "model.pkl"
+ENCODINGS_FILE = "encodings.npy"
+NAMES_FILE = "names.json"
 DB_FILE = "attendance_system.db"
 CAMERA_INDEX = 0
 TOLERANCE = 0.5
 
+# Detection runs on the frame shrunk by this factor per side. HOG with one
+# upsample finds faces down to ~40 px in the image it sees, so 2 keeps
+# faces of ~80 px in the full frame detectable
+DETECTION_SCALE = 2
+
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 480
+
+# Galleries at least this big are searched through a FAISS HNSW graph
+# (if faiss is installed) instead of being scanned in full
+INDEX_MIN_GALLERY = 1000
+
+# The CNN detector is only worth it on a GPU; on CPU use single-pass HOG
+DETECTION_MODEL = "cnn" if dlib.DLIB_USE_CUDA else "hog"
+
+# With opencv-contrib-python, faces are followed by cheap OpenCV trackers
+# between detections; the detector only runs every DETECT_EVERY frames,
+# and a tracker is dropped after MAX_MISSES failed updates
+DETECT_EVERY = 30
+MAX_MISSES = 5
+
+# A detected face overlapping a recognised tracked face by at least this
+# much (intersection over union) keeps its name without being re-encoded
+REUSE_OVERLAP = 0.5
+
 
 # ================= DATABASE =================
 
+# One connection for the whole run; each mark is committed straight away
+# (cheap with WAL and synchronous=NORMAL) so a killed process loses nothing
+conn = sqlite3.connect(DB_FILE)
+conn.execute("PRAGMA journal_mode=WAL")
+conn.execute("PRAGMA synchronous=NORMAL")
+
+
 def save_to_db(name):
 
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cur = conn.cursor()
 
         now = datetime.now()
 
         student_id = name.lower().replace(" ", "_")
         date_today = now.strftime("%Y-%m-%d")
 
-        cur.execute("""
-            INSERT OR IGNORE INTO attendance
-            (student_id, name, date, time, status)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            student_id,
-            name,
-            date_today,
-            now.strftime("%H:%M:%S"),
-            "Present"
-        ))
-
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("""
+                INSERT OR IGNORE INTO attendance
+                (student_id, name, date, time, status)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                student_id,
+                name,
+                date_today,
+                now.strftime("%H:%M:%S"),
+                "Present"
+            ))
 
         print(f"[DB] Saved: {name}", flush=True)
 
@@ -53,17 +107,242 @@ def save_to_db(name):
 
 # ================= LOAD MODEL =================
 
-if not os.path.exists(MODEL_FILE):
+def gallery_is_current():
+
+    if not (os.path.exists(ENCODINGS_FILE) and os.path.exists(NAMES_FILE)):
+        return False
+
+    # A model.pkl written or restored after the .npy pair takes precedence
+    if os.path.exists(MODEL_FILE):
+        return os.path.getmtime(ENCODINGS_FILE) >= os.path.getmtime(MODEL_FILE)
+
+    return True
+
+
+if gallery_is_current():
+
+    # Contiguous float32 (N, 128) array, memory-mapped rather than unpickled
+    known_encodings = np.load(ENCODINGS_FILE, mmap_mode="r")
+
+    with open(NAMES_FILE, "r", encoding="utf-8") as f:
+        known_names = json.load(f)
+
+elif os.path.exists(MODEL_FILE):
+
+    # Model from an older train_model.py, or newer than the .npy pair
+    with open(MODEL_FILE, "rb") as f:
+        data = pickle.load(f)
+
+    known_encodings = np.asarray(data["encodings"], dtype=np.float32)
+    known_names = data["names"]
+
+else:
+
     print("[ERROR] model.pkl not found", flush=True)
     sys.exit(1)
 
 
-with open(MODEL_FILE, "rb") as f:
-    data = pickle.load(f)
+# One (N, 128) array so all faces in a frame are matched with one matmul
+known_encodings = known_encodings.reshape(-1, 128)
+known_sq_norms = np.einsum("ij,ij->i", known_encodings, known_encodings)
+
+index = None
+
+if FAISS_AVAILABLE and len(known_names) >= INDEX_MIN_GALLERY:
+
+    index = faiss.IndexHNSWFlat(known_encodings.shape[1], 32)
+    index.add(np.ascontiguousarray(known_encodings, dtype=np.float32))
+
+    print(f"[INFO] Indexed {len(known_names)} faces with FAISS", flush=True)
+
+
+# ================= MATCHING =================
+
+if NUMBA_AVAILABLE:
+
+    # Nearest gallery row within tol2 (squared), or -1. Each row's sum is
+    # abandoned as soon as it passes the best so far, checked every 32 dims
+    # so the inner loop still vectorises
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def match_one(gallery, query, tol2):
+
+        best_i = -1
+        best_d = tol2
+
+        for i in range(gallery.shape[0]):
+
+            d = 0.0
+
+            for start in range(0, gallery.shape[1], 32):
+
+                for j in range(start, min(start + 32, gallery.shape[1])):
+                    t = gallery[i, j] - query[j]
+                    d += t * t
+
+                if d >= best_d:
+                    break
+
+            if d < best_d:
+                best_d = d
+                best_i = i
+
+        return best_i
+
+
+    # Plain ndarray view (not np.memmap) for Numba; compile before the camera starts
+    gallery = np.asarray(known_encodings)
+    match_one(gallery, np.zeros(gallery.shape[1], dtype=gallery.dtype), 0.0)
+
+
+def match_faces(encodings):
+
+    if len(encodings) == 0 or len(known_names) == 0:
+        return ["Unknown"] * len(encodings)
+
+    # Same dtype as the gallery so the matmul doesn't upcast a copy of it
+    query = np.asarray(encodings, dtype=known_encodings.dtype)
+
+
+    if index is not None:
+
+        # Nearest neighbour by squared L2 distance, from the graph
+        dists, ids = index.search(np.ascontiguousarray(query, dtype=np.float32), 1)
+
+        return [
+            known_names[i] if i >= 0 and d <= TOLERANCE * TOLERANCE else "Unknown"
+            for d, i in zip(dists[:, 0], ids[:, 0])
+        ]
+
+
+    if NUMBA_AVAILABLE:
+
+        best = [match_one(gallery, q, TOLERANCE * TOLERANCE) for q in query]
+
+        return [known_names[i] if i >= 0 else "Unknown" for i in best]
+
+
+    # |q - k|^2 = |q|^2 + |k|^2 - 2 q.k, with every q.k from a single GEMM
+    dists = (
+        np.einsum("ij,ij->i", query, query)[:, None]
+        + known_sq_norms
+        - 2.0 * (query @ known_encodings.T)
+    )
+
+    best = dists.argmin(axis=1)
+    within = dists[np.arange(len(query)), best] <= TOLERANCE * TOLERANCE
+
+    return [
+        known_names[best_i] if ok else "Unknown"
+        for best_i, ok in zip(best, within)
+    ]
+
+
+# ================= LABELS =================
+
+# Every name is rasterised once at load; drawing a label is then a
+# masked copy into the frame instead of a putText call
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.8
+LABEL_COLOR = (0, 255, 0)
+LABEL_THICKNESS = 2
+LABEL_PAD = LABEL_THICKNESS
+
+
+def render_label(name):
+
+    (width, height), baseline = cv2.getTextSize(name, LABEL_FONT, LABEL_SCALE, LABEL_THICKNESS)
+
+    patch = np.zeros(
+        (height + baseline + 2 * LABEL_PAD, width + 2 * LABEL_PAD, 3),
+        dtype=np.uint8
+    )
+
+    cv2.putText(
+        patch,
+        name,
+        (LABEL_PAD, LABEL_PAD + height),
+        LABEL_FONT,
+        LABEL_SCALE,
+        LABEL_COLOR,
+        LABEL_THICKNESS
+    )
+
+    # Keep the text's origin so labels land where putText would draw them
+    return patch, patch.any(axis=2, keepdims=True), (LABEL_PAD, LABEL_PAD + height)
+
+
+label_cache = {name: render_label(name) for name in {*known_names, "Unknown"}}
+
+
+def draw_label(frame, name, x, y):
+
+    patch, mask, (origin_x, origin_y) = label_cache[name]
+
+    x -= origin_x
+    y -= origin_y
 
+    # Clip to the frame for faces near its edges
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + patch.shape[1], frame.shape[1])
+    y1 = min(y + patch.shape[0], frame.shape[0])
 
-known_encodings = data["encodings"]
-known_names = data["names"]
+    if x1 <= x0 or y1 <= y0:
+        return
+
+    area = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+
+    np.copyto(frame[y0:y1, x0:x1], patch[area], where=mask[area])
+
+
+# ================= TRACKING =================
+
+# MOSSE and KCF ship with opencv-contrib-python. The main package only has
+# slow trackers (MIL) that would cost more than detecting every 3rd frame
+TRACKER_FACTORY = next(
+    (
+        factory for factory in (
+            getattr(getattr(cv2, "legacy", None), "TrackerMOSSE_create", None),
+            getattr(cv2, "TrackerKCF_create", None),
+        )
+        if factory is not None
+    ),
+    None
+)
+
+if TRACKER_FACTORY is None:
+
+    # No tracker to fill the gaps, so detect as often as before
+    DETECT_EVERY = 3
+
+    print("[INFO] No fast OpenCV tracker (needs opencv-contrib-python), detecting every 3rd frame", flush=True)
+
+
+def overlap(a, b):
+
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+
+    if bottom <= top or right <= left:
+        return 0.0
+
+    inter = (bottom - top) * (right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+
+    return inter / (area_a + area_b - inter)
+
+
+def start_tracker(frame, face):
+
+    if TRACKER_FACTORY is None:
+        return None
+
+    top, right, bottom, left = face
+
+    tracker = TRACKER_FACTORY()
+    tracker.init(frame, (left, top, right - left, bottom - top))
+
+    return tracker
 
 
 # ================= CAMERA =================
@@ -75,9 +354,71 @@ def open_camera():
     if not cap.isOpened():
         return None
 
+
+    # Ask the driver for frames at the working size, and not to queue stale ones
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
     return cap
 
 
+# Reads the camera on a background thread, keeping only the newest frame,
+# so waiting on the driver overlaps with detection and drawing
+class FrameGrabber:
+
+    def __init__(self, cap):
+
+        self.cap = cap
+        self.ret = True
+        self.frame = None
+        self.running = True
+
+        self.lock = threading.Lock()
+        self.fresh = threading.Event()
+
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+
+    def _loop(self):
+
+        while self.running:
+
+            ret, frame = self.cap.read()
+
+            with self.lock:
+
+                self.ret = ret
+
+                if ret:
+                    self.frame = frame
+
+                self.fresh.set()
+
+            if not ret:
+                return
+
+
+    def read(self):
+
+        # Block until a frame newer than the last one handed out arrives
+        self.fresh.wait()
+
+        with self.lock:
+
+            self.fresh.clear()
+
+            return self.ret, self.frame
+
+
+    def stop(self):
+
+        self.running = False
+        self.thread.join(timeout=1)
+
+
 cap = None
 
 while cap is None:
@@ -89,6 +430,8 @@ while cap is None:
         time.sleep(2)
 
 
+grabber = FrameGrabber(cap)
+
 print("[INFO] Camera started", flush=True)
 print("[INFO] Press Q to quit", flush=True)
 
@@ -97,63 +440,104 @@ print("[INFO] Press Q to quit", flush=True)
 
 marked = set()
 frame_count = 0
+tracks = []
+
+# Per-frame buffers, reused so resizing and colour conversion don't allocate
+resized = np.empty((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+rgb = np.empty_like(resized)
 
 
 while True:
 
-    ret, frame = cap.read()
+    ret, frame = grabber.read()
 
     if not ret:
 
         print("[WARNING] Camera lost, reconnecting...", flush=True)
 
+        grabber.stop()
         cap.release()
         time.sleep(1)
 
         cap = open_camera()
+
+        while cap is None:
+            time.sleep(1)
+            cap = open_camera()
+
+        grabber = FrameGrabber(cap)
         continue
 
 
-    frame = cv2.resize(frame, (640, 480))
+    # Only cameras that ignored the requested size need resizing
+    if frame.shape[:2] != (FRAME_HEIGHT, FRAME_WIDTH):
+        frame = cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT), dst=resized)
 
 
     frame_count += 1
 
-    if frame_count % 3 != 0:
 
-        cv2.imshow("Face Attendance", frame)
+    if frame_count % DETECT_EVERY == 0:
 
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
 
-        continue
 
+        # Detect on a downscaled copy, then encode at full resolution
+        small = cv2.resize(
+            rgb,
+            (0, 0),
+            fx=1 / DETECTION_SCALE,
+            fy=1 / DETECTION_SCALE
+        )
 
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        faces = [
+            (top * DETECTION_SCALE, right * DETECTION_SCALE,
+             bottom * DETECTION_SCALE, left * DETECTION_SCALE)
+            for (top, right, bottom, left) in face_recognition.face_locations(
+                small,
+                number_of_times_to_upsample=1,
+                model=DETECTION_MODEL
+            )
+        ]
 
 
-    faces = face_recognition.face_locations(rgb)
-    encodings = face_recognition.face_encodings(rgb, faces)
+        # Faces still on a recognised track keep their name; only new
+        # or unknown faces go through the encoder
+        names = [None] * len(faces)
 
+        for i, face in enumerate(faces):
 
-    for enc, (top, right, bottom, left) in zip(encodings, faces):
+            for track in tracks:
 
-        matches = face_recognition.compare_faces(
-            known_encodings,
-            enc,
-            tolerance=TOLERANCE
-        )
+                if track["name"] != "Unknown" and overlap(face, track["box"]) >= REUSE_OVERLAP:
+                    names[i] = track["name"]
+                    break
+
+
+        new = [i for i, name in enumerate(names) if name is None]
 
-        name = "Unknown"
+        if new:
 
+            encodings = face_recognition.face_encodings(rgb, [faces[i] for i in new])
 
-        if True in matches:
+            for i, name in zip(new, match_faces(encodings)):
+                names[i] = name
 
-            index = matches.index(True)
-            name = known_names[index]
 
+        tracks = [
+            {
+                "tracker": start_tracker(frame, face),
+                "box": face,
+                "name": name,
+                "misses": 0
+            }
+            for name, face in zip(names, faces)
+        ]
 
-            if name not in marked:
+
+        for name in names:
+
+            if name != "Unknown" and name not in marked:
 
                 marked.add(name)
 
@@ -161,6 +545,37 @@ while True:
 
                 print(f"[INFO] Marked: {name}", flush=True)
 
+        visible = tracks
+
+    else:
+
+        for track in tracks:
+
+            if track["tracker"] is None:
+                continue
+
+            ok, (x, y, w, h) = track["tracker"].update(frame)
+
+            if ok:
+                track["box"] = (int(y), int(x + w), int(y + h), int(x))
+                track["misses"] = 0
+            else:
+                track["misses"] += 1
+
+
+        tracks = [track for track in tracks if track["misses"] < MAX_MISSES]
+
+        # Without trackers the boxes would be stale, so only draw on detection frames
+        visible = [
+            track for track in tracks
+            if track["tracker"] is not None and track["misses"] == 0
+        ]
+
+
+    for track in visible:
+
+        top, right, bottom, left = track["box"]
+
 
         # Draw face box
         cv2.rectangle(
@@ -173,15 +588,7 @@ while True:
 
 
         # Show name
-        cv2.putText(
-            frame,
-            name,
-            (left, top - 10),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.8,
-            (0, 255, 0),
-            2
-        )
+        draw_label(frame, track["name"], left, top - 10)
 
 
     cv2.imshow("Face Attendance", frame)
@@ -195,6 +602,9 @@ while True:
 
 print("[INFO] Closing camera...", flush=True)
 
+conn.close()
+
+grabber.stop()
 cap.release()
 cv2.destroyAllWindows()
 
@@ -1,13 +1,55 @@
 import face_recognition
+import dlib
 import os
+import json
 import pickle
+import numpy as np
 
 DATASET_DIR = "dataset"
 MODEL_FILE = "model.pkl"
+ENCODINGS_FILE = "encodings.npy"
+NAMES_FILE = "names.json"
+
+# With CUDA, faces are located in batches on the GPU with the CNN detector
+USE_CUDA = dlib.DLIB_USE_CUDA
+BATCH_SIZE = 32
 
 known_encodings = []
 known_names = []
 
+
+def load_and_locate(person_path, img_names):
+    if not USE_CUDA:
+        # One image in memory at a time; batching wouldn't help the CPU detector
+        for img_name in img_names:
+            image = face_recognition.load_image_file(os.path.join(person_path, img_name))
+            yield img_name, image, face_recognition.face_locations(image)
+        return
+
+    images = [
+        face_recognition.load_image_file(os.path.join(person_path, img_name))
+        for img_name in img_names
+    ]
+
+    # batch_face_locations needs equally sized images, so batch by shape
+    locations = [None] * len(images)
+    by_shape = {}
+    for i, image in enumerate(images):
+        by_shape.setdefault(image.shape, []).append(i)
+
+    for indexes in by_shape.values():
+        for start in range(0, len(indexes), BATCH_SIZE):
+            batch = indexes[start:start + BATCH_SIZE]
+            found = face_recognition.batch_face_locations(
+                [images[i] for i in batch],
+                batch_size=len(batch)
+            )
+            for i, faces in zip(batch, found):
+                locations[i] = faces
+
+    yield from zip(img_names, images, locations)
+
+
 print("[INFO] Training started...")
 
 for person_name in os.listdir(DATASET_DIR):
@@ -18,16 +60,16 @@ for person_name in os.listdir(DATASET_DIR):
 
     print(f"[INFO] Processing: {person_name}")
 
-    for img_name in os.listdir(person_path):
-        img_path = os.path.join(person_path, img_name)
-
-        image = face_recognition.load_image_file(img_path)
-        encodings = face_recognition.face_encodings(image)
+    img_names = os.listdir(person_path)
 
-        if len(encodings) == 0:
+    for img_name, image, faces in load_and_locate(person_path, img_names):
+        if len(faces) == 0:
             print(f"[WARNING] No face found in {img_name}")
             continue
 
+        # Only the first face is kept, so only encode that one
+        encodings = face_recognition.face_encodings(image, known_face_locations=faces[:1])
+
         known_encodings.append(encodings[0])
         known_names.append(person_name)
 
@@ -39,5 +81,11 @@ data = {
 with open(MODEL_FILE, "wb") as f:
     pickle.dump(data, f)
 
+# recognize.py memory-maps these instead of unpickling model.pkl
+np.save(ENCODINGS_FILE, np.asarray(known_encodings, dtype=np.float32).reshape(-1, 128))
+
+with open(NAMES_FILE, "w", encoding="utf-8") as f:
+    json.dump(known_names, f)
+
 print("[INFO] Training completed!")
 print(f"[INFO] Model saved as {MODEL_FILE}")